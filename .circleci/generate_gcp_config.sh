@@ -33,6 +33,7 @@ jobs:
           region: ${GOOGLE_REGION}
           service-name: '${GOOGLE_PROJECT_ID}'
           unauthenticated: true
+          args: '--set-env-vars=USE_SECRET_MANAGER=1'
       
       - run:
           name: Webhook Success
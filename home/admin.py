@@ -4,4 +4,7 @@ from home.models import *
 # Register your models here.
 admin.site.register(MyUser)
 admin.site.register(Post)
-admin.site.register(Like)
\ No newline at end of file
+admin.site.register(Like)
+admin.site.register(Follow)
+admin.site.register(Job)
+admin.site.register(ArchivedPost)
@@ -0,0 +1,37 @@
+import time
+from collections import namedtuple
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from home.cache import LocalBackend
+
+# What the viewsets get as `request.auth`
+TokenClaims = namedtuple('TokenClaims', ['user_id', 'token_type', 'jti', 'exp'])
+
+# raw token bytes -> TokenClaims, only for tokens that passed validation
+token_cache = LocalBackend(settings.JWT_CACHE['MAX_ENTRIES'], settings.JWT_CACHE['TTL'])
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    # JWTAuthentication that verifies each access token once per process.
+    # Verified claims are kept in a small LRU until the token expires (or the
+    # cache TTL, whichever comes first) and exposed to views as `request.auth`.
+
+    def get_validated_token(self, raw_token):
+        cached = token_cache.get_many([raw_token])
+        if raw_token in cached:
+            return cached[raw_token]
+        validated_token = super().get_validated_token(raw_token)
+        claims = TokenClaims(
+            user_id=validated_token.get(api_settings.USER_ID_CLAIM),
+            token_type=validated_token.get(api_settings.TOKEN_TYPE_CLAIM),
+            jti=validated_token.get(api_settings.JTI_CLAIM),
+            exp=validated_token['exp'],
+        )
+        ttl = min(settings.JWT_CACHE['TTL'], claims.exp - time.time())
+        if ttl > 0:
+            token_cache.set_many({raw_token: claims}, ttl=ttl)
+        return claims
+
+    def get_user(self, validated_token):
+        return super().get_user({api_settings.USER_ID_CLAIM: validated_token.user_id})
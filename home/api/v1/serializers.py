@@ -6,7 +6,8 @@ from allauth.utils import email_address_exists
 from django.contrib.auth.hashers import make_password
 from allauth.account.adapter import get_adapter
 from allauth.account.utils import setup_user_email
-from rest_framework import serializers
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 from home.models import *
 
 
@@ -16,7 +17,8 @@ from home.models import *
 class SignupSerializer(serializers.ModelSerializer):
     class Meta:
         model = MyUser
-        fields = ('id',  'first_name', 'last_name', 'username', 'email', 'password')
+        fields = ('id',  'first_name', 'last_name', 'username', 'email', 'password', 'email_verification')
+        read_only_fields = ('email_verification',)
         extra_kwargs = {
             'password': {
                 'write_only': True,
@@ -69,10 +71,116 @@ class PostSerializer(serializers.ModelSerializer):
     # Post Model Serializer for CRUD operations
     class Meta:
         model = Post
-        fields = ['id', 'author', 'body', 'active', 'created_at', 'updated_at']
+        fields = ['id', 'author', 'body', 'active', 'like_count', 'unlike_count', 'created_at', 'updated_at']
+        read_only_fields = ['like_count', 'unlike_count']
 
 class LikeSerializer(serializers.ModelSerializer):
     # Post Model Serializer for CRUD operations
     class Meta:
         model = Like
         fields = ['id', 'user', 'post', 'value']
+
+class LikeCreateSerializer(LikeSerializer):
+    # Create input: (user, post) uniqueness is enforced by the upsert, a repeated reaction replaces the previous one
+    class Meta(LikeSerializer.Meta):
+        validators = []
+
+class PostBulkSerializer(PostSerializer):
+    # Bulk create input: the author is the requesting user, so it is not looked up per item
+    class Meta(PostSerializer.Meta):
+        read_only_fields = ['author', 'like_count', 'unlike_count']
+
+class LikeBulkSerializer(LikeCreateSerializer):
+    # Bulk create input: posts are checked with one query for the whole batch, so no per item lookups
+    post = serializers.IntegerField()
+
+    class Meta(LikeCreateSerializer.Meta):
+        read_only_fields = ['user']
+
+class FollowSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Follow
+        fields = ['id', 'follower', 'followee', 'created_at']
+        read_only_fields = ['follower']
+
+
+class ValuesRowSerializer:
+    # Read-only fast path for a ModelSerializer. Rows are read with
+    # .values_list() and every column goes through a converter picked once per
+    # field, instead of instantiating models and walking the field machinery per
+    # row. Output matches serializer_class(..., many=True).data item for item.
+    # Fields must be plain model columns (no source='a.b' or method fields).
+
+    # fields whose to_representation returns database values unchanged
+    passthrough_fields = (
+        serializers.IntegerField, serializers.CharField, serializers.BooleanField,
+        serializers.ChoiceField, serializers.PrimaryKeyRelatedField,
+    )
+
+    def __init__(self, serializer_class):
+        fields = [field for field in serializer_class().fields.values() if not field.write_only]
+        model = serializer_class.Meta.model
+        self.names = [field.field_name for field in fields]
+        self.columns = [model._meta.get_field(field.source).attname for field in fields]
+        self.fields = fields
+
+    def converter(self, field):
+        if isinstance(field, serializers.DateTimeField):
+            return self.datetime_converter(field)
+        if isinstance(field, self.passthrough_fields):
+            return None
+        return field.to_representation
+
+    def datetime_converter(self, field):
+        if getattr(field, 'format', api_settings.DATETIME_FORMAT).lower() != ISO_8601:
+            return field.to_representation
+        # resolved per call since the current timezone can be activated per request
+        field_timezone = getattr(field, 'timezone', field.default_timezone())
+        if field_timezone is None:
+            return field.to_representation
+
+        def convert(value):
+            if value.tzinfo is None:
+                return field.to_representation(value)
+            value = value.astimezone(field_timezone).isoformat()
+            if value.endswith('+00:00'):
+                value = value[:-6] + 'Z'
+            return value
+        return convert
+
+    def parse_fields(self, value):
+        # "?fields=id,author" -> ['id', 'author'] in serializer order, None for all fields
+        if not value:
+            return None
+        requested = {name.strip() for name in value.split(',') if name.strip()}
+        unknown = requested.difference(self.names)
+        if unknown:
+            raise serializers.ValidationError({
+                "fields": [f"Unknown fields requested: {', '.join(sorted(unknown))}. Available fields are {', '.join(self.names)}."]
+            })
+        return [name for name in self.names if name in requested] or None
+
+    def iter_rows(self, queryset, chunk_size=None, fields=None):
+        # `fields` limits both the SELECT list and the output keys
+        selected = [index for index, name in enumerate(self.names) if fields is None or name in fields]
+        names = [self.names[index] for index in selected]
+        converters = [
+            (position, converter) for position, converter in enumerate(self.converter(self.fields[index]) for index in selected)
+            if converter
+        ]
+        rows = queryset.values_list(*[self.columns[index] for index in selected])
+        if chunk_size:
+            rows = rows.iterator(chunk_size=chunk_size)
+        for row in rows:
+            if converters:
+                row = list(row)
+                for position, converter in converters:
+                    if row[position] is not None:
+                        row[position] = converter(row[position])
+            yield dict(zip(names, row))
+
+    def serialize(self, queryset, fields=None):
+        return list(self.iter_rows(queryset, fields=fields))
+
+post_rows = ValuesRowSerializer(PostSerializer)
+like_rows = ValuesRowSerializer(LikeSerializer)
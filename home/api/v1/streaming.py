@@ -0,0 +1,29 @@
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+# ?stream=1 on a listing returns every matching row as one JSON array
+STREAM_QUERY_PARAM = 'stream'
+
+
+def wants_stream(request):
+    return request.query_params.get(STREAM_QUERY_PARAM, '').lower() in ('1', 'true', 'yes')
+
+
+def stream_json_array(items):
+    # Yield a JSON array one element at a time; `items` should itself be lazy
+    # (e.g. rows read with .iterator(), a server-side cursor on Postgres) so
+    # only one chunk of rows is alive at any point.
+    encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    yield '['
+    separator = ''
+    for item in items:
+        yield separator + encoder.encode(item)
+        separator = ','
+    yield ']'
+
+
+class StreamingJSONResponse(StreamingHttpResponse):
+
+    def __init__(self, items, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(stream_json_array(items), **kwargs)
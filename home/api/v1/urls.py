@@ -8,6 +8,8 @@ from home.api.v1.viewsets import (
     SignupViewSet,
     PostViewSet,
     LikeViewSet,
+    FollowViewSet,
+    FeedViewSet,
 )
 
 router = DefaultRouter()
@@ -16,11 +18,15 @@ router.register("posts", PostViewSet, basename="posts")
 router.register("posts/<int:post_id>/?", PostViewSet, basename="posts")
 router.register("likes", LikeViewSet, basename="likes")
 router.register("likes/<int:like_id>/?", LikeViewSet, basename="likes")
+router.register("follows", FollowViewSet, basename="follows")
+router.register("feed", FeedViewSet, basename="feed")
 
 urlpatterns = [
     path('login/', TokenObtainPairView.as_view(), name='login'),
     path('refresh-token/', TokenRefreshView.as_view(), name='refresh-token'),
+    path('email-verification/', SignupViewSet.get_email_verification, name='email-verification'),
     path('user-posts/<int:user_id>', PostViewSet.get_user_posts, name='user-posts'),
+    path('post-cache-stats/', PostViewSet.get_post_cache_stats, name='post-cache-stats'),
     path('post-reactions/<int:post_id>', LikeViewSet.get_reactions_on_post, name='reaction-count'),
     # path('getunlikecount/<int:post_id>', LikeViewSet.getUnlikeCountOnPost, name='getunlikecount'),
     path("", include(router.urls))
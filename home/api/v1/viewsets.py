@@ -1,139 +1,213 @@
-from rest_framework.viewsets import ModelViewSet
+from rest_framework.viewsets import GenericViewSet, ModelViewSet
 from rest_framework.response import Response
 from rest_framework import status
 from home.models import *
 from rest_framework import permissions
-from rest_framework_simplejwt.backends import TokenBackend
-import requests
-import json
-from holidays import country_holidays
-from validate_email import validate_email
-import threading
-from datetime import date
-from rest_framework.decorators import api_view
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.decorators import action, api_view
 from rest_framework.decorators import  permission_classes as permission_classes_for_method
 
 
 from home.api.v1.serializers import (
     SignupSerializer,
     PostSerializer,
-    LikeSerializer
+    LikeSerializer,
+    LikeCreateSerializer,
+    PostBulkSerializer,
+    LikeBulkSerializer,
+    FollowSerializer,
+    post_rows,
+    like_rows,
 )
+from home.api.v1.pagination import KeysetPagination, OffsetPagination
+from home.api.v1.streaming import StreamingJSONResponse, wants_stream
+from home.api.v1.conditional import make_etag, not_modified, set_validators
+from home.reactions import upsert_reactions
+from home.cache import post_cache
+from home.jobs import enqueue, enqueue_many
+from home.feed import remove_author_from_feed
+from home.search import search_post_ids
+from home.trending import trending
+
+
+def load_post_payloads(post_ids):
+    # Loader for post_cache misses; ids not live any more may have been archived
+    # (home.archive). Always read from the primary: a payload from a lagging
+    # replica would be cached and served to everyone, the writer included.
+    posts = Post.objects.using(DEFAULT_DB_ALIAS).filter(id__in=post_ids)
+    payloads = {payload['id']: payload for payload in post_rows.iter_rows(posts)}
+    missing = [post_id for post_id in post_ids if post_id not in payloads]
+    if missing:
+        archived = ArchivedPost.objects.using(DEFAULT_DB_ALIAS).filter(id__in=missing)
+        payloads.update((payload['id'], payload) for payload in post_rows.iter_rows(archived))
+    return payloads
+
+
+def requested_post_fields(request):
+    # ?fields=id,author,created_at -> sparse post payloads, None for the full ones
+    return post_rows.parse_fields(request.query_params.get('fields'))
+
+
+def load_posts(post_ids, fields=None):
+    # Full payloads come from the post cache. Sparse ones are read straight from
+    # the requested columns, so e.g. a list screen never loads `body`.
+    if fields is None:
+        return post_cache.get_many(post_ids, load_post_payloads)
+    columns = fields if 'id' in fields else ['id'] + fields
+    rows = {row['id']: row for row in post_rows.iter_rows(Post.objects.filter(id__in=post_ids), fields=columns)}
+    payloads = [rows[post_id] for post_id in post_ids if post_id in rows]
+    if 'id' not in fields:
+        for payload in payloads:
+            del payload['id']
+    return payloads
+
+
+def conditional_page(request, response):
+    # ETag over the page just built, so validators cost no query beyond the
+    # page itself (a MAX/COUNT over the collection is O(N) on every request).
+    # The query string is part of it since cursor, page_size and fields each
+    # select another representation. No Last-Modified: removing a row leaves
+    # the newest updated_at where it was.
+    etag = make_etag(request.get_full_path(), response.data)
+    return not_modified(request, etag) or set_validators(response, etag)
+
+
+def stream_posts(queryset, fields=None):
+    # full listing in one response, newest first, bypassing the post cache
+    queryset = queryset.order_by('-created_at', '-id')
+    return StreamingJSONResponse(post_rows.iter_rows(queryset, chunk_size=settings.STREAM_CHUNK_SIZE, fields=fields))
+
+
+def bulk_request_error(data):
+    if not isinstance(data, list) or not data:
+        return Response(data={"message": "Expected a non empty list of items."}, status=status.HTTP_400_BAD_REQUEST)
+    if len(data) > settings.BULK_MAX_ITEMS:
+        return Response(data={"message": f"At most {settings.BULK_MAX_ITEMS} items can be sent at once."}, status=status.HTTP_400_BAD_REQUEST)
+    return None
+
+
+def bulk_insert(model, objs):
+    # bulk_create only sets primary keys on backends that return them (Postgres),
+    # elsewhere insert one by one so every created row can be reported back
+    if connection.features.can_return_ids_from_bulk_insert:
+        return model.objects.bulk_create(objs, batch_size=settings.BULK_MAX_ITEMS)
+    for obj in objs:
+        obj.save(force_insert=True)
+    return objs
 
 
 class SignupViewSet(ModelViewSet):
     serializer_class = SignupSerializer
     http_method_names = ["post"]
 
-    def perform_data_enrichment(self, request, retry):
-        try:
-            enriched_data = {}
-            x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-            if x_forwarded_for:
-                ip = x_forwarded_for.split(',')[0]
-            else:
-                ip = request.META.get('REMOTE_ADDR')
-            print("User IP address --> ", ip)
-            # ip = '39.110.142.79'
-            response = requests.get(f"https://geolocation-db.com/json/{ip}?position=true")
-            if response.status_code == 200:
-                geolocation = json.loads(response.text)
-                print("Geolocation -->", geolocation)
-                if geolocation['country_code'] == 'Not found':
-                    print(f"Can't fetch geolocation for {request.data['email']} having ip address {ip}")
-                    enriched_data['latitude'] = None
-                    enriched_data['longitude'] = None
-                    enriched_data['country'] = None
-                    enriched_data['holiday'] = None
-                else:
-                    given_holidays = country_holidays(geolocation['country_code'])
-                    is_holiday = date.today() in given_holidays
-                    print(f"{date.today} is {'a' if is_holiday else 'not a'} holiday")
-                    # signup_user['ip'] = geolocation['IPv4']
-                    enriched_data['latitude'] = geolocation['latitude']
-                    enriched_data['longitude'] = geolocation['longitude']
-                    enriched_data['country'] = geolocation['country_name']
-                    enriched_data['holiday'] = is_holiday
-            else:
-                raise Exception(f"Can't fetch geolocation for {request.data['email']} having ip address {ip}")
-
-            MyUser.objects.filter(username=request.data['username']).update(latitude=enriched_data['latitude'], longitude=enriched_data['longitude'], country=enriched_data['country'], holiday=enriched_data['holiday'])
-            print(f"Enriched {request.data['email']} with data ", enriched_data)
-        except Exception as e:
-            print(e)
-            if retry < 3:
-                retry += 1
-                self.perform_data_enrichment(request, retry)
-
+    def get_client_ip(self, request):
+        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+        if x_forwarded_for:
+            return x_forwarded_for.split(',')[0].strip()
+        return request.META.get('REMOTE_ADDR')
 
     def create(self, request, *args, **kwargs):
+        # only the cheap checks inline, MX/SMTP verification runs in the job worker.
+        # Imported here, it loads the blacklist and is only needed for signups
+        from validate_email import validate_email
         is_valid = validate_email(
             email_address=request.data['email'],
             check_format=True,
             check_blacklist=True,
-            check_dns=True,
-            dns_timeout=10,
-            check_smtp=True,
-            smtp_timeout=10,
-            smtp_helo_host='my.host.name',
-            smtp_from_address='my@from.addr.ess',
-            smtp_skip_tls=False,
-            smtp_tls_context=None,
-            smtp_debug=False
+            check_dns=False,
+            check_smtp=False,
         )
         if not is_valid:
             print(f"{request.data['email']} is not a valid email address")
             return Response(data={"message": f"{request.data['email']} is not a valid email address. Please enter a valid email."}, status=status.HTTP_400_BAD_REQUEST)
-        data_enrichment = threading.Thread(target=self.perform_data_enrichment, name="DataEnrichment", args=[request, 1])
-        data_enrichment.start()
         serializer = self.serializer_class(
             data=request.data, context={"request": request}
         )
         serializer.is_valid(raise_exception=True)
-        return super().create(request, *args, **kwargs)
+        with transaction.atomic():
+            response = super().create(request, *args, **kwargs)
+            # geolocation/holiday enrichment runs in the job worker (manage.py run_jobs)
+            enqueue('enrich_signup', {'user_id': response.data['id'], 'ip': self.get_client_ip(request)})
+            enqueue('verify_email', {'user_id': response.data['id'], 'email': response.data['email']})
+        return response
+
+    @api_view(['GET'])
+    @permission_classes_for_method((permissions.IsAuthenticated, ))
+    def get_email_verification(request):
+        return Response(data={"email": request.user.email, "email_verification": request.user.email_verification})
 
 class PostViewSet(ModelViewSet):
     serializer_class = PostSerializer
     queryset = Post.objects.all()
     permission_classes = (permissions.IsAuthenticated,)
     http_method_names = ["get", "post", "put", 'delete']
+    pagination_class = KeysetPagination
 
     def list(self, request, *args, **kwargs):
-        posts = Post.objects.all()
-        return Response(data=PostSerializer(posts, many=True).data)
+        fields = requested_post_fields(request)
+        if wants_stream(request):
+            return stream_posts(Post.objects.all(), fields)
+        # only the keys are read here, payloads come from the post cache
+        posts = self.paginate_queryset(Post.objects.only('id', 'created_at'))
+        return conditional_page(request, self.get_paginated_response(load_posts([post.id for post in posts], fields)))
 
     def retrieve(self, request, *args, **kwargs):
         post_id = kwargs['pk']
-        post = Post.objects.filter(id=post_id).first()
-        if post is None:
+        fields = requested_post_fields(request)
+        if fields is None:
+            payloads = post_cache.get_many([int(post_id)], load_post_payloads)
+        else:
+            # a sparse miss reads only the requested columns (and updated_at for
+            # the validators) and is not cached; archived posts stay readable
+            columns = set(fields) | {'id', 'updated_at'}
+            payloads = (
+                post_cache.get_many([int(post_id)])
+                or post_rows.serialize(Post.objects.filter(id=post_id), fields=columns)
+                or post_rows.serialize(ArchivedPost.objects.filter(id=post_id), fields=columns)
+            )
+        if not payloads:
             return Response(data={"message": f"No post found against id {post_id}."}, status=status.HTTP_404_NOT_FOUND)
-        return Response(data=PostSerializer(post).data)
+        payload = payloads[0]
+        # writes invalidate the cached payload, so its updated_at is current
+        last_modified = parse_datetime(payload['updated_at'])
+        etag = make_etag(payload['id'], payload['updated_at'], fields)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        if fields is not None:
+            payload = {name: payload[name] for name in fields}
+        return set_validators(Response(data=payload), etag, last_modified)
 
     def create(self, request, *args, **kwargs):
-        token = request.META.get('HTTP_AUTHORIZATION', " ").split(' ')[1]
-        active_user = TokenBackend(algorithm='HS256').decode(token, verify=False)
-        request.data['author'] = active_user['user_id']
+        request.data['author'] = request.user.id
         serializer = self.serializer_class(
             data=request.data, context={"request": request}
         )
         serializer.is_valid(raise_exception=True)
-        return super().create(request, *args, **kwargs)
+        with transaction.atomic():
+            response = super().create(request, *args, **kwargs)
+            enqueue('fan_out_post', {'post_id': response.data['id']})
+        post_cache.set(response.data['id'], response.data)
+        return response
 
     def update(self, request, *args, **kwargs):
         post_id = kwargs['pk']
         post = Post.objects.filter(id=post_id).first()
         if post is None:
             return Response(data={"message": f"No post found against id {post_id}."}, status=status.HTTP_404_NOT_FOUND)
-        token = request.META.get('HTTP_AUTHORIZATION', " ").split(' ')[1]
-        active_user = TokenBackend(algorithm='HS256').decode(token, verify=False)
-        if post.author.id != active_user['user_id']:
+        if post.author_id != request.user.id:
             return Response(data={"message": f"User is not authorized to update post having id {post_id}."}, status=status.HTTP_403_FORBIDDEN)
-        request.data['author'] = active_user['user_id']
+        request.data['author'] = request.user.id
         serializer = self.serializer_class(
             data=request.data, context={"request": request}
         )
         serializer.is_valid(raise_exception=True)
-        return super().update(request, *args, **kwargs)
+        response = super().update(request, *args, **kwargs)
+        post_cache.invalidate(post.id)
+        return response
 
     def destroy(self, request, *args, **kwargs):
         post_id = kwargs['pk']
@@ -141,11 +215,54 @@ class PostViewSet(ModelViewSet):
         post = Post.objects.filter(id=post_id).first()
         if post is None:
             return Response(data={"message": f"No post found against id {post_id} to delete."}, status=status.HTTP_404_NOT_FOUND)
-        token = request.META.get('HTTP_AUTHORIZATION', " ").split(' ')[1]
-        active_user = TokenBackend(algorithm='HS256').decode(token, verify=False)
-        if post.author.id != active_user['user_id']:
+        if post.author_id != request.user.id:
             return Response(data={"message": f"User is not authorized to delete post having id {post_id}."}, status=status.HTTP_403_FORBIDDEN)
-        return super().destroy(request, *args, **kwargs)
+        # hidden from every read at once, the reactions are deleted in batches by the reap_post job
+        now = timezone.now()
+        with transaction.atomic():
+            Post.objects.filter(id=post.id).update(deleted_at=now, updated_at=now)
+            enqueue('reap_post', {'post_id': post.id})
+        post_cache.invalidate(post.id)
+        trending.discard(post.id)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request, *args, **kwargs):
+        error = bulk_request_error(request.data)
+        if error is not None:
+            return error
+        serializer = PostBulkSerializer(data=request.data, many=True, context={"request": request})
+        if not serializer.is_valid():
+            return Response(data={"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            posts = bulk_insert(Post, [Post(author_id=request.user.id, **item) for item in serializer.validated_data])
+            enqueue_many('fan_out_post', [{'post_id': post.id} for post in posts])
+        payloads = PostSerializer(posts, many=True).data
+        for payload in payloads:
+            post_cache.set(payload['id'], payload)
+        return Response(data={"results": payloads}, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'], url_path='trending')
+    def trending(self, request, *args, **kwargs):
+        # best TOP_K posts by decayed like score, read from home.trending without touching Like
+        try:
+            limit = int(request.query_params.get('page_size', settings.TRENDING['TOP_K']))
+        except ValueError:
+            limit = settings.TRENDING['TOP_K']
+        limit = max(1, min(limit, settings.TRENDING['TOP_K']))
+        fields = requested_post_fields(request)
+        return Response(data={"results": load_posts([post_id for post_id, _ in trending.top(limit)], fields)})
+
+    @action(detail=False, methods=['get'], url_path='search')
+    def search(self, request, *args, **kwargs):
+        # ?q=words, ranked by relevance through the full-text index in home.search
+        text = request.query_params.get('q', '').strip()
+        if not text:
+            return Response(data={"message": "Query parameter q is required to search posts."}, status=status.HTTP_400_BAD_REQUEST)
+        fields = requested_post_fields(request)
+        paginator = OffsetPagination()
+        post_ids = paginator.paginate_ids(lambda limit, offset: search_post_ids(text, limit, offset), request)
+        return paginator.get_paginated_response(load_posts(post_ids, fields))
 
     @api_view(['GET'])
     @permission_classes_for_method((permissions.IsAuthenticated, ))
@@ -153,16 +270,29 @@ class PostViewSet(ModelViewSet):
         user = MyUser.objects.filter(id=user_id).first()
         if user is None:
             return Response(data={"message": f"No user found against id {user_id} while retrieving posts."}, status=status.HTTP_404_NOT_FOUND)
-        posts = Post.objects.filter(author=user_id)
-        return Response(data=PostSerializer(posts, many=True).data)
+        fields = requested_post_fields(request)
+        if wants_stream(request):
+            return stream_posts(Post.objects.filter(author=user_id), fields)
+        paginator = KeysetPagination()
+        posts = paginator.paginate_queryset(Post.objects.filter(author=user_id).only('id', 'created_at'), request)
+        return conditional_page(request, paginator.get_paginated_response(load_posts([post.id for post in posts], fields)))
+
+    @api_view(['GET'])
+    @permission_classes_for_method((permissions.IsAdminUser, ))
+    def get_post_cache_stats(request):
+        return Response(data=post_cache.stats())
 
 
 class LikeViewSet(ModelViewSet):
     serializer_class = LikeSerializer
-    queryset = Like.objects.all()
+    # likes on soft-deleted or archiving posts wait for the reaper / archive_posts
+    queryset = Like.objects.filter(post__deleted_at=None, post__archived_at=None)
     permission_classes = (permissions.IsAuthenticated,)
     http_method_names = ["get", "post", "put"]
 
+    def list(self, request, *args, **kwargs):
+        return Response(data=like_rows.serialize(self.filter_queryset(self.get_queryset())))
+
     # not required
     # def list(self, request, *args, **kwargs):
     #     token = request.META.get('HTTP_AUTHORIZATION', " ").split(' ')[1]
@@ -183,43 +313,79 @@ class LikeViewSet(ModelViewSet):
     #     return Response(data=LikeSerializer(like).data)
 
     def create(self, request, *args, **kwargs):
-        token = request.META.get('HTTP_AUTHORIZATION', " ").split(' ')[1]
-        active_user = TokenBackend(algorithm='HS256').decode(token, verify=False)
-        request.data['user'] = active_user['user_id']
-        Like.objects.filter(user=active_user['user_id'],post=request.data['post']).delete()
-        serializer = self.serializer_class(
+        request.data['user'] = request.user.id
+        serializer = LikeCreateSerializer(
             data=request.data, context={"request": request}
         )
         serializer.is_valid(raise_exception=True)
-        return super().create(request, *args, **kwargs)
+        post_id = serializer.validated_data['post'].id
+        value = serializer.validated_data.get('value', 'Like')
+        like_id, previous = upsert_reactions(request.user.id, {post_id: value})[post_id]
+        # a user's like counts once, toggling Unlike/Like adds nothing
+        if value == 'Like' and previous is None:
+            trending.record([post_id])
+        like = Like(id=like_id, user_id=request.user.id, post_id=post_id, value=value)
+        return Response(data=LikeSerializer(like).data, status=status.HTTP_201_CREATED)
 
-    # not required
-    # def update(self, request, *args, **kwargs):
-    #     like_id = kwargs['pk']
-    #     like = Like.objects.filter(id=like_id).first()
-    #     if like is None:
-    #         return Response(data={"message": f"No like found against id {like_id} to update."}, status=status.HTTP_404_NOT_FOUND)
-    #     token = request.META.get('HTTP_AUTHORIZATION', " ").split(' ')[1]
-    #     active_user = TokenBackend(algorithm='HS256').decode(token, verify=False)
-    #     if like.user_id != active_user['user_id']:
-    #         return Response(data={"message": f"User is not authorized to update like having id {like_id}."},status=status.HTTP_403_FORBIDDEN)
-    #     request.data['user'] = active_user['user_id']
-    #     serializer = self.serializer_class(
-    #         data=request.data, context={"request": request}
-    #     )
-    #     serializer.is_valid(raise_exception=True)
-    #     return super().update(request, *args, **kwargs)
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request, *args, **kwargs):
+        error = bulk_request_error(request.data)
+        if error is not None:
+            return error
+        serializer = LikeBulkSerializer(data=request.data, many=True, context={"request": request})
+        if not serializer.is_valid():
+            return Response(data={"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        items = serializer.validated_data
+        post_ids = {item['post'] for item in items}
+        existing = set(Post.objects.filter(id__in=post_ids).values_list('id', flat=True))
+        if existing != post_ids:
+            errors = [{} if item['post'] in existing else {"post": [f"No post found against id {item['post']}."]} for item in items]
+            return Response(data={"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+        # the last reaction sent for a post wins
+        reactions = {item['post']: item.get('value', 'Like') for item in items}
+        results = upsert_reactions(request.user.id, reactions)
+        trending.record([post_id for post_id, (_, previous) in results.items() if reactions[post_id] == 'Like' and previous is None])
+        likes = {
+            post_id: Like(id=like_id, user_id=request.user.id, post_id=post_id, value=reactions[post_id])
+            for post_id, (like_id, _) in results.items()
+        }
+        return Response(data={"results": [LikeSerializer(likes[item['post']]).data for item in items]}, status=status.HTTP_201_CREATED)
+
+    def update(self, request, *args, **kwargs):
+        # goes through upsert_reactions like create, so the counters, the post
+        # cache and the (user, post) constraint stay in step
+        like_id = kwargs['pk']
+        like = self.get_queryset().filter(id=like_id).first()
+        if like is None:
+            return Response(data={"message": f"No like found against id {like_id} to update."}, status=status.HTTP_404_NOT_FOUND)
+        if like.user_id != request.user.id:
+            return Response(data={"message": f"User is not authorized to update like having id {like_id}."}, status=status.HTTP_403_FORBIDDEN)
+        data = dict(request.data.items(), user=request.user.id)
+        serializer = self.serializer_class(like, data=data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        if serializer.validated_data['post'].id != like.post_id:
+            return Response(data={"message": f"Like having id {like_id} belongs to post {like.post_id}, react to the other post instead."}, status=status.HTTP_400_BAD_REQUEST)
+        value = serializer.validated_data.get('value', like.value)
+        upsert_reactions(request.user.id, {like.post_id: value})
+        like.value = value
+        return Response(data=LikeSerializer(like).data)
 
     # not required
     @api_view(['GET'])
     @permission_classes_for_method((permissions.IsAuthenticated, ))
     def get_reactions_on_post(request, post_id):
-        post = Post.objects.filter(pk=post_id).first()
+        post = Post.objects.filter(pk=post_id).only('id', 'like_count', 'unlike_count', 'updated_at').first()
+        if post is None:
+            post = ArchivedPost.objects.filter(pk=post_id).only('id', 'like_count', 'unlike_count', 'updated_at').first()
         if post is None:
             return Response(data={"message": f"No post found against id {post_id} to get reactions."}, status=status.HTTP_404_NOT_FOUND)
-        num_of_likes = Like.objects.filter(post=post_id, value='Like').count()
-        num_of_dislikes = Like.objects.filter(post=post_id, value='Like').count()
-        return Response({"num_of_likes": num_of_likes, "num_of_likes": num_of_dislikes, "post_id": post_id}, status=200)
+        # reaction writes bump updated_at along with the counters
+        etag = make_etag('reactions', post.id, post.updated_at.isoformat())
+        response = not_modified(request, etag, post.updated_at)
+        if response is not None:
+            return response
+        response = Response({"num_of_likes": post.like_count, "num_of_unlikes": post.unlike_count, "post_id": post_id}, status=200)
+        return set_validators(response, etag, post.updated_at)
 
     # not required
     # @api_view(['GET'])
@@ -230,3 +396,53 @@ class LikeViewSet(ModelViewSet):
     #         return Response(data={"message": f"No post found against id {post_id} to get unlikes count."}, status=status.HTTP_404_NOT_FOUND)
     #     numOfLikes = Like.objects.filter(post=post_id, value='Unlike').count()
     #     return Response({"numOfLikes": numOfLikes, "post_id": post_id}, status=200)
+
+
+class FollowViewSet(ModelViewSet):
+    serializer_class = FollowSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+    http_method_names = ["get", "post", "delete"]
+
+    def get_queryset(self):
+        return Follow.objects.filter(follower=self.request.user.id)
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.serializer_class(
+            data=request.data, context={"request": request}
+        )
+        serializer.is_valid(raise_exception=True)
+        if serializer.validated_data['followee'].id == request.user.id:
+            return Response(data={"message": "Users can not follow themselves."}, status=status.HTTP_400_BAD_REQUEST)
+        followee_id = serializer.validated_data['followee'].id
+        # following again is a no-op; the unique_together validator is skipped
+        # because follower is read-only, so the constraint is the real check
+        try:
+            with transaction.atomic():
+                follow = serializer.save(follower_id=request.user.id)
+                enqueue('backfill_feed', {'user_id': request.user.id, 'author_id': follow.followee_id})
+        except IntegrityError:
+            follow = Follow.objects.filter(follower=request.user.id, followee=followee_id).first()
+            if follow is None:
+                raise
+            return Response(data=FollowSerializer(follow).data, status=status.HTTP_200_OK)
+        return Response(data=serializer.data, status=status.HTTP_201_CREATED)
+
+    def destroy(self, request, *args, **kwargs):
+        follow = self.get_queryset().filter(id=kwargs['pk']).first()
+        if follow is None:
+            return Response(data={"message": f"No follow found against id {kwargs['pk']} to delete."}, status=status.HTTP_404_NOT_FOUND)
+        with transaction.atomic():
+            follow.delete()
+            remove_author_from_feed(request.user.id, follow.followee_id)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class FeedViewSet(GenericViewSet):
+    # The requesting user's home feed, materialized by the fan-out in home.feed
+    permission_classes = (permissions.IsAuthenticated,)
+    pagination_class = KeysetPagination
+
+    def list(self, request, *args, **kwargs):
+        fields = requested_post_fields(request)
+        entries = self.paginate_queryset(FeedEntry.objects.filter(user=request.user.id).only('id', 'post_id', 'created_at'))
+        return self.get_paginated_response(load_posts([entry.post_id for entry in entries], fields))
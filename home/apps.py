@@ -1,5 +1,18 @@
 from django.apps import AppConfig
+from django.db import router
+from django.db.models.signals import post_migrate
+
+
+def create_search_index(sender, using, **kwargs):
+    # the post search index is raw SQL since the app ships no migrations
+    from home.models import Post
+    from home.search import ensure_search_index
+    if router.allow_migrate_model(using, Post):
+        ensure_search_index(using)
 
 
 class HomeConfig(AppConfig):
     name = 'home'
+
+    def ready(self):
+        post_migrate.connect(create_search_index, sender=self)
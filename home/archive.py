@@ -0,0 +1,129 @@
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from home.cache import post_cache
+from home.constants import LIKE_CHOICES_LIST
+from home.models import ArchivedLike, ArchivedPost, FeedEntry, Like, Post
+from home.reactions import COUNTER_FIELDS
+from home.reaper import delete_batch
+
+# Posts older than ARCHIVE['AFTER_DAYS'] move out of home_post / home_like into
+# ArchivedPost / ArchivedLike, keeping their ids, so the live tables, their
+# indexes and the COUNTs over them only grow with recent activity. Rows are
+# copied by INSERT ... SELECT inside the database, in three steps:
+#   1. mark: up to BATCH_SIZE posts are copied to ArchivedPost and get
+#      archived_at, which hides them from Post.objects; reads fall back to the
+#      archive from then on.
+#   2. move: their likes and feed entries go ROW_BATCH_SIZE rows per
+#      transaction, so a post with a million likes never holds a long lock.
+#   3. finish: with the post rows locked (no like can be added any more), the
+#      likes committed since are moved, the archived counters are recounted
+#      from ArchivedLike and the post rows deleted.
+# A stopped run leaves marked posts behind, the next one finishes them first.
+
+
+def archive_cutoff(now=None):
+    return (now or timezone.now()) - timedelta(days=settings.ARCHIVE['AFTER_DAYS'])
+
+
+def copy_rows(cursor, source, target, column, ids):
+    # INSERT INTO target (columns of target) SELECT the same columns FROM source WHERE column IN ids
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(field.column) for field in target._meta.concrete_fields)
+    cursor.execute(
+        "INSERT INTO {target} ({columns}) SELECT {columns} FROM {source} WHERE {column} IN ({ids})".format(
+            target=quote(target._meta.db_table), source=quote(source._meta.db_table), columns=columns,
+            column=quote(column), ids=', '.join(['%s'] * len(ids)),
+        ),
+        ids,
+    )
+
+
+def mark_batch(cutoff, batch_size):
+    # Copies up to `batch_size` of the oldest live posts created before `cutoff`
+    # and marks them archived. Soft-deleted posts are left to the reaper.
+    # Returns the ids marked.
+    with transaction.atomic():
+        post_ids = list(
+            Post.objects.select_for_update().filter(created_at__lt=cutoff)
+                .order_by('created_at', 'id').values_list('id', flat=True)[:batch_size]
+        )
+        if not post_ids:
+            return []
+        with connection.cursor() as cursor:
+            copy_rows(cursor, Post, ArchivedPost, Post._meta.pk.column, post_ids)
+        Post.all_objects.filter(id__in=post_ids).update(archived_at=timezone.now())
+    return post_ids
+
+
+def move_likes(post_ids, batch_size):
+    # One transaction, up to `batch_size` likes. Returns the number moved.
+    with transaction.atomic():
+        like_ids = list(
+            Like.objects.select_for_update().filter(post__in=post_ids).order_by().values_list('id', flat=True)[:batch_size]
+        )
+        if like_ids:
+            with connection.cursor() as cursor:
+                copy_rows(cursor, Like, ArchivedLike, Like._meta.pk.column, like_ids)
+            Like.objects.filter(id__in=like_ids).delete()
+    return len(like_ids)
+
+
+def move_dependents(post_ids):
+    config = settings.ARCHIVE
+    batch_size = config['ROW_BATCH_SIZE']
+    while move_likes(post_ids, batch_size) == batch_size:
+        time.sleep(config['PAUSE'])
+    while delete_batch(FeedEntry.objects.filter(post__in=post_ids), batch_size) == batch_size:
+        time.sleep(config['PAUSE'])
+
+
+def archived_counters():
+    return {
+        COUNTER_FIELDS[value]: Coalesce(Subquery(
+            ArchivedLike.objects.filter(post=OuterRef('pk'), value=value)
+                .order_by().values('post').annotate(total=Count('id')).values('total'),
+            output_field=IntegerField(),
+        ), 0)
+        for value in LIKE_CHOICES_LIST
+    }
+
+
+def finish(post_ids):
+    # Only the likes added while move_dependents ran are left, so this
+    # transaction stays short.
+    with transaction.atomic():
+        post_ids = list(Post.all_objects.select_for_update().filter(id__in=post_ids).values_list('id', flat=True))
+        if not post_ids:
+            return
+        while move_likes(post_ids, settings.ARCHIVE['ROW_BATCH_SIZE']):
+            pass
+        FeedEntry.objects.filter(post__in=post_ids).delete()
+        ArchivedPost.objects.filter(id__in=post_ids).update(**archived_counters())
+        Post.all_objects.filter(id__in=post_ids).delete()
+        post_cache.invalidate(*post_ids)
+
+
+def archive_posts(cutoff, max_batches=None, on_batch=None):
+    # Batches until nothing older than `cutoff` is left or `max_batches` ran,
+    # ARCHIVE['PAUSE'] seconds apart. Returns the number of posts moved.
+    config = settings.ARCHIVE
+    marked = Post.all_objects.exclude(archived_at=None).order_by('created_at', 'id')
+    moved = batches = 0
+    while max_batches is None or batches < max_batches:
+        # posts a stopped run already marked come first
+        post_ids = list(marked.values_list('id', flat=True)[:config['BATCH_SIZE']]) or mark_batch(cutoff, config['BATCH_SIZE'])
+        if not post_ids:
+            break
+        move_dependents(post_ids)
+        finish(post_ids)
+        moved += len(post_ids)
+        batches += 1
+        if on_batch is not None:
+            on_batch(moved)
+        time.sleep(config['PAUSE'])
+    return moved
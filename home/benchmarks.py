@@ -0,0 +1,171 @@
+import io
+import json
+import math
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import RefreshToken
+from home.cache import LocalBackend, post_cache
+from home.factories import DEFAULT_PASSWORD, LikeFactory, PostFactory, UserFactory
+from home.models import Like, MyUser, Post
+from home.trending import LocalTrending
+
+# One endpoint under load: `request(context, i)` returns (method, path, data)
+# for the i-th call, `expected` the status code a successful call returns.
+Scenario = namedtuple('Scenario', ['name', 'request', 'expected'])
+
+
+@contextmanager
+def private_caches():
+    # Benchmarks run on a throwaway database: their post payloads, replica pins
+    # and trending scores go to in-process stores instead of the configured
+    # ones, so a shared redis is neither cleared nor filled with test rows
+    import home.api.v1.viewsets as viewsets
+    import home.db_router as db_router
+    config = settings.POST_CACHE
+    saved = post_cache.backend, db_router.pins, viewsets.trending
+    post_cache.backend = LocalBackend(config['MAX_ENTRIES'], config['TTL'])
+    db_router.pins = LocalBackend(config['MAX_ENTRIES'], config['TTL'])
+    viewsets.trending = LocalTrending(settings.TRENDING)
+    try:
+        yield
+    finally:
+        post_cache.backend, db_router.pins, viewsets.trending = saved
+
+
+def seed(users, posts_per_user, likes_per_user, rng):
+    # Realistic dataset built with the factories, inserted in bulk
+    UserFactory.reset_sequence()
+    authors = MyUser.objects.bulk_create(UserFactory.build_batch(users))
+    if not connection.features.can_return_ids_from_bulk_insert:
+        authors = list(MyUser.objects.filter(username__in=[user.username for user in authors]))
+    Post.objects.bulk_create([PostFactory.build(author=author) for author in authors for _ in range(posts_per_user)])
+    post_ids = list(Post.objects.values_list('id', flat=True))
+    likes = []
+    for user in authors:
+        for post_id in rng.sample(post_ids, min(likes_per_user, len(post_ids))):
+            likes.append(LikeFactory.build(user=user, post_id=post_id))
+    Like.objects.bulk_create(likes)
+    call_command('rebuild_reaction_counts', stdout=io.StringIO())
+    return authors, post_ids
+
+
+class BenchmarkContext:
+    # State shared by the scenarios: an authenticated client acting as `user`
+    # and the ids it may read, update or delete.
+
+    def __init__(self, user, post_ids, rng):
+        self.user = user
+        self.post_ids = post_ids
+        self.rng = rng
+        self.client = Client()
+        token = RefreshToken.for_user(user).access_token
+        self.auth = {'HTTP_AUTHORIZATION': f"Bearer {token}"}
+        self.own_posts = []
+
+    def random_post(self):
+        return self.rng.choice(self.post_ids)
+
+    def own_post(self):
+        # a post of the benchmark user's that no other scenario deletes
+        if not self.own_posts:
+            self.own_posts = list(Post.objects.filter(author=self.user).values_list('id', flat=True))
+        return self.rng.choice(self.own_posts)
+
+    def fresh_post(self):
+        return Post.objects.create(author=self.user, body="To be deleted", active=True).id
+
+
+SCENARIOS = [
+    Scenario('signup', lambda ctx, i: ('post', '/api/v1/signup/', {
+        'username': f"bench_signup_{i}", 'email': f"bench_signup_{i}@example.com",
+        'password': DEFAULT_PASSWORD, 'first_name': "Bench", 'last_name': "User",
+    }), 201),
+    Scenario('login', lambda ctx, i: ('post', '/api/v1/login/', {
+        'username': ctx.user.username, 'password': DEFAULT_PASSWORD,
+    }), 200),
+    Scenario('posts_list', lambda ctx, i: ('get', '/api/v1/posts/', None), 200),
+    Scenario('posts_retrieve', lambda ctx, i: ('get', f'/api/v1/posts/{ctx.random_post()}/', None), 200),
+    Scenario('posts_create', lambda ctx, i: ('post', '/api/v1/posts/', {'body': f"Benchmark post {i}", 'active': True}), 201),
+    Scenario('posts_update', lambda ctx, i: ('put', f'/api/v1/posts/{ctx.own_post()}/', {'body': f"Edited {i}", 'active': True}), 200),
+    Scenario('posts_delete', lambda ctx, i: ('delete', f'/api/v1/posts/{ctx.fresh_post()}/', None), 204),
+    Scenario('user_posts', lambda ctx, i: ('get', f'/api/v1/user-posts/{ctx.user.id}', None), 200),
+    Scenario('likes_create', lambda ctx, i: ('post', '/api/v1/likes/', {
+        'post': ctx.random_post(), 'value': ctx.rng.choice(['Like', 'Unlike']),
+    }), 201),
+    Scenario('post_reactions', lambda ctx, i: ('get', f'/api/v1/post-reactions/{ctx.random_post()}', None), 200),
+]
+
+
+def percentile(values, p):
+    # nearest-rank percentile of an already sorted list
+    if not values:
+        return None
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def run_scenario(scenario, context, requests, warmup=0):
+    latencies = []
+    queries = []
+    errors = 0
+    # negative i are warmup calls, not recorded
+    for i in range(-warmup, requests):
+        method, path, data = scenario.request(context, i)
+        kwargs = dict(context.auth)
+        if data is not None:
+            kwargs.update(data=json.dumps(data), content_type='application/json')
+        with CaptureQueriesContext(connection) as captured:
+            request_started = time.perf_counter()
+            response = getattr(context.client, method)(path, **kwargs)
+            elapsed = time.perf_counter() - request_started
+        if i < 0:
+            continue
+        latencies.append(elapsed)
+        queries.append(len(captured))
+        if response.status_code != scenario.expected:
+            errors += 1
+    # one client issuing requests back to back, so throughput is 1 / mean latency
+    total = sum(latencies)
+    latencies.sort()
+    return {
+        'requests': requests,
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'throughput_rps': round(requests / total, 1) if total else None,
+        'queries_avg': round(sum(queries) / len(queries), 2),
+        'queries_max': max(queries),
+    }
+
+
+def run_benchmarks(context, requests, names=None, warmup=0):
+    results = {}
+    for scenario in SCENARIOS:
+        if names and scenario.name not in names:
+            continue
+        post_cache.clear()
+        results[scenario.name] = run_scenario(scenario, context, requests, warmup)
+    return results
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    # Regressions against a saved run: slower p95 beyond `tolerance` (a ratio),
+    # more queries per request, or any new errors
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if result['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {result['p95_ms']}ms, baseline {previous['p95_ms']}ms")
+        if result['queries_max'] > previous['queries_max']:
+            regressions.append(f"{name}: {result['queries_max']} queries per request, baseline {previous['queries_max']}")
+        if result['errors'] > previous['errors']:
+            regressions.append(f"{name}: {result['errors']} failed requests, baseline {previous['errors']}")
+    return regressions
@@ -0,0 +1,178 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+
+
+class LocalBackend:
+    # In-process LRU with a per-entry TTL. Shared by all threads of a worker.
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        found = {}
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is None:
+                    continue
+                expires_at, value = entry
+                if expires_at <= now:
+                    del self._data[key]
+                    continue
+                self._data.move_to_end(key)
+                found[key] = value
+        return found
+
+    def set_many(self, mapping, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            for key, value in mapping.items():
+                self._data[key] = (expires_at, value)
+                self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self, prefix=''):
+        with self._lock:
+            if not prefix:
+                self._data.clear()
+                return
+            for key in [key for key in self._data if key.startswith(prefix)]:
+                del self._data[key]
+
+    def size(self):
+        return len(self._data)
+
+
+class RedisBackend:
+    # Shared cache across workers. Eviction is left to the server's
+    # maxmemory-policy (configure allkeys-lru), entries expire after `ttl`.
+
+    def __init__(self, url, ttl, key_prefix='tradecore:'):
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured("POST_CACHE backend 'redis' requires the redis package")
+        if not url:
+            raise ImproperlyConfigured("POST_CACHE backend 'redis' requires REDIS_URL")
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+
+    @property
+    def evictions(self):
+        # evicted_keys from INFO stats, counted by the server across all its keys
+        return self.client.info('stats').get('evicted_keys', 0)
+
+    def get_many(self, keys):
+        if not keys:
+            return {}
+        values = self.client.mget([self.key_prefix + key for key in keys])
+        return {key: json.loads(value) for key, value in zip(keys, values) if value is not None}
+
+    def set_many(self, mapping, ttl=None):
+        pipeline = self.client.pipeline(transaction=False)
+        for key, value in mapping.items():
+            pipeline.setex(self.key_prefix + key, self.ttl if ttl is None else ttl, json.dumps(value))
+        pipeline.execute()
+
+    def delete_many(self, keys):
+        if keys:
+            self.client.delete(*[self.key_prefix + key for key in keys])
+
+    def clear(self, prefix=''):
+        # only our keys starting with `prefix`: the trending scores and the
+        # replica pins share the server and the key_prefix
+        keys = list(self.client.scan_iter(match=self.key_prefix + prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+    def size(self):
+        return None
+
+
+class PostCache:
+    # Read-through cache of serialized posts, one entry per post so writes can
+    # invalidate exactly the posts they touched.
+    key_prefix = 'post:'
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def make_key(self, post_id):
+        return f"{self.key_prefix}{post_id}"
+
+    def get_many(self, post_ids, load=None):
+        # Return payloads for `post_ids` in order; `load(ids)` must return
+        # {id: payload} for the ids missing from the cache. Unknown ids are
+        # skipped, and so are misses when there is no `load`.
+        keys = {self.make_key(post_id): post_id for post_id in post_ids}
+        found = self.backend.get_many(list(keys))
+        payloads = {keys[key]: value for key, value in found.items()}
+        missing = [post_id for key, post_id in keys.items() if key not in found]
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(missing)
+        if missing and load is not None:
+            loaded = load(missing)
+            if loaded:
+                self.backend.set_many({self.make_key(post_id): value for post_id, value in loaded.items()})
+                payloads.update(loaded)
+        return [payloads[post_id] for post_id in post_ids if post_id in payloads]
+
+    def set(self, post_id, payload):
+        self.backend.set_many({self.make_key(post_id): payload})
+
+    def invalidate(self, *post_ids):
+        # Drop now and again once the write commits, so a reader that refilled
+        # the entry from the old row in between does not keep it until the TTL.
+        keys = [self.make_key(post_id) for post_id in post_ids]
+        self.backend.delete_many(keys)
+        transaction.on_commit(lambda: self.backend.delete_many(keys))
+
+    def clear(self):
+        self.backend.clear(self.key_prefix)
+
+    def stats(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            'backend': type(self.backend).__name__,
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / lookups, 4) if lookups else None,
+            'evictions': self.backend.evictions,
+            'size': self.backend.size(),
+        }
+
+
+def load_backend(config):
+    backend = config.get('BACKEND', 'local')
+    if backend == 'local':
+        return LocalBackend(config['MAX_ENTRIES'], config['TTL'])
+    if backend == 'redis':
+        return RedisBackend(config.get('LOCATION'), config['TTL'])
+    raise ImproperlyConfigured(f"Unknown POST_CACHE backend {backend!r}")
+
+
+post_cache = PostCache(load_backend(settings.POST_CACHE))
@@ -5,3 +5,27 @@ LIKE_CHOICES = [
 ]
 
 LIKE_CHOICES_LIST = [i[0] for i in LIKE_CHOICES]
+
+JOB_PENDING = 'pending'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+JOB_STATUS_CHOICES = [
+    (JOB_PENDING, 'Pending'),
+    (JOB_RUNNING, 'Running'),
+    (JOB_DONE, 'Done'),
+    (JOB_FAILED, 'Failed'),
+]
+
+EMAIL_PENDING = 'pending'
+EMAIL_VALID = 'valid'
+EMAIL_INVALID = 'invalid'
+EMAIL_UNKNOWN = 'unknown'
+
+EMAIL_VERIFICATION_CHOICES = [
+    (EMAIL_PENDING, 'Pending'),
+    (EMAIL_VALID, 'Valid'),
+    (EMAIL_INVALID, 'Invalid'),
+    (EMAIL_UNKNOWN, 'Unknown'),
+]
@@ -0,0 +1,288 @@
+import csv
+import json
+import os
+import time
+from contextlib import contextmanager
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from home.models import ArchivedLike, ArchivedPost, Like, MyUser, Post
+
+# Tables moved by export_data / import_data, in import order (a row's foreign
+# keys point to tables earlier in the list)
+TABLES = {
+    'users': MyUser,
+    'posts': Post,
+    'likes': Like,
+    'archived_posts': ArchivedPost,
+    'archived_likes': ArchivedLike,
+}
+FORMATS = ['ndjson', 'csv']
+EXPORT_STATE = '.export-state.json'
+IMPORT_STATE = '.import-state.json'
+
+
+def columns(model):
+    # many-to-many relations (user groups and permissions) are not moved
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def data_path(directory, table, fmt):
+    return os.path.join(directory, f"{table}.{fmt}")
+
+
+def parse_moment(value):
+    # "2026-01-31" or a full ISO 8601 datetime, naive ones in TIME_ZONE
+    moment = parse_datetime(value)
+    if moment is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError(f"Invalid date or datetime: {value}")
+        moment = timezone.datetime(date.year, date.month, date.day)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def in_range(column, since, until):
+    condition = Q()
+    if since is not None:
+        condition &= Q(**{f"{column}__gte": since})
+    if until is not None:
+        condition &= Q(**{f"{column}__lt": until})
+    return condition
+
+
+def export_queryset(table, since, until):
+    # --since/--until select posts by created_at and likes by their post's
+    # created_at (likes carry no timestamp of their own), live and archived
+    # alike. Users are the ones who joined in the range plus every author and
+    # liker of the exported rows, so an export always loads into an empty
+    # database.
+    posts_in_range = in_range('created_at', since, until)
+    likes_in_range = in_range('post__created_at', since, until)
+    # soft-deleted posts are not exported, neither are their reactions. Posts
+    # halfway through archive_posts are, so their likes still have a parent;
+    # the next archive run after the import finishes them.
+    posts = Post.all_objects.filter(posts_in_range, deleted_at=None)
+    likes = Like.objects.filter(likes_in_range, post__deleted_at=None)
+    archived_posts = ArchivedPost.objects.filter(posts_in_range)
+    archived_likes = ArchivedLike.objects.filter(likes_in_range)
+    querysets = {'posts': posts, 'likes': likes, 'archived_posts': archived_posts, 'archived_likes': archived_likes}
+    if table in querysets:
+        return querysets[table]
+    users = MyUser.objects.all()
+    if since is None and until is None:
+        return users
+    return users.annotate(
+        authored=Exists(posts.filter(author=OuterRef('pk'))),
+        reacted=Exists(likes.filter(user=OuterRef('pk'))),
+        authored_archived=Exists(archived_posts.filter(author=OuterRef('pk'))),
+        reacted_archived=Exists(archived_likes.filter(user=OuterRef('pk'))),
+    ).filter(
+        in_range('date_joined', since, until) | Q(authored=True) | Q(reacted=True)
+        | Q(authored_archived=True) | Q(reacted_archived=True)
+    )
+
+
+def read_state(path):
+    try:
+        with open(path) as state_file:
+            return json.load(state_file)
+    except OSError:
+        return {}
+
+
+def write_state(path, state):
+    # renamed into place so an interrupted run never leaves half a checkpoint
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as state_file:
+        json.dump(state, state_file)
+    os.replace(tmp_path, path)
+
+
+def encode(value):
+    # datetimes and dates as ISO 8601, read back by the model field's to_python
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+class NDJSONWriter:
+
+    def __init__(self, out, names, new_file):
+        self.out = out
+        self.names = names
+
+    def write(self, row):
+        self.out.write(json.dumps(dict(zip(self.names, map(encode, row))), separators=(',', ':')))
+        self.out.write('\n')
+
+
+class CSVWriter:
+    # None is written as an empty cell and read back as None for nullable columns
+
+    def __init__(self, out, names, new_file):
+        self.writer = csv.writer(out)
+        if new_file:
+            self.writer.writerow(names)
+
+    def write(self, row):
+        self.writer.writerow(['' if value is None else encode(value) for value in row])
+
+
+WRITERS = {'ndjson': NDJSONWriter, 'csv': CSVWriter}
+
+
+def read_records(path, fmt):
+    # one dict per row, read lazily
+    with open(path, newline='') as data_file:
+        if fmt == 'csv':
+            yield from csv.DictReader(data_file)
+        else:
+            for line in data_file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def decoder(model, fmt):
+    fields = {field.attname: field for field in model._meta.concrete_fields}
+
+    def decode(record):
+        values = {}
+        for name, value in record.items():
+            field = fields.get(name)
+            if field is None:
+                continue
+            if fmt == 'csv' and value == '' and field.null:
+                value = None
+            values[name] = None if value is None else field.to_python(value)
+        return model(**values)
+    return decode
+
+
+@contextmanager
+def preserve_timestamps(model):
+    # auto_now / auto_now_add would overwrite the exported created_at/updated_at
+    fields = [field for field in model._meta.concrete_fields if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def reset_sequences(models):
+    # keep new ids clear of the imported ones (no-op on SQLite)
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+
+class Throughput:
+    # prints rows and rows/second for a table every `interval` seconds
+
+    def __init__(self, stdout, table, done=0, interval=5.0):
+        self.stdout = stdout
+        self.table = table
+        self.rows = done
+        self.started = self.reported = time.perf_counter()
+        self.moved = 0
+        self.interval = interval
+
+    def add(self, rows):
+        self.rows += rows
+        self.moved += rows
+        if time.perf_counter() - self.reported >= self.interval:
+            self.report()
+
+    def rate(self):
+        return self.moved / max(time.perf_counter() - self.started, 1e-9)
+
+    def report(self, final=False):
+        self.reported = time.perf_counter()
+        prefix = "done" if final else "progress"
+        self.stdout.write(f"{self.table}: {prefix}, {self.rows} rows, {self.rate():.0f} rows/s")
+
+
+def export_table(directory, table, fmt, batch_size, since, until, state, state_path, stdout):
+    # Rows in primary key order through a chunked (server-side on Postgres)
+    # cursor. After every chunk the file is flushed and its size and last id
+    # checkpointed, so a resumed export truncates any partial chunk and
+    # continues after that id.
+    model = TABLES[table]
+    names = columns(model)
+    pk_index = names.index(model._meta.pk.attname)
+    progress = state.setdefault('tables', {}).setdefault(table, {'last_id': None, 'offset': 0, 'rows': 0})
+    if progress.get('complete'):
+        stdout.write(f"{table}: already exported, skipping")
+        return
+    queryset = export_queryset(table, since, until).order_by('pk')
+    if progress['last_id'] is not None:
+        queryset = queryset.filter(pk__gt=progress['last_id'])
+    path = data_path(directory, table, fmt)
+    throughput = Throughput(stdout, table, progress['rows'])
+    with open(path, 'a' if progress['offset'] else 'w', newline='') as out:
+        out.truncate(progress['offset'])
+        writer = WRITERS[fmt](out, names, new_file=not progress['offset'])
+        pending = 0
+
+        def checkpoint(last_id):
+            out.flush()
+            progress.update(last_id=last_id, offset=os.fstat(out.fileno()).st_size, rows=progress['rows'] + pending)
+            write_state(state_path, state)
+            throughput.add(pending)
+
+        last_id = progress['last_id']
+        for row in queryset.values_list(*names).iterator(chunk_size=batch_size):
+            writer.write(row)
+            last_id = row[pk_index]
+            pending += 1
+            if pending == batch_size:
+                checkpoint(last_id)
+                pending = 0
+        checkpoint(last_id)
+    progress['complete'] = True
+    write_state(state_path, state)
+    throughput.report(final=True)
+
+
+def import_table(directory, table, fmt, batch_size, state, state_path, stdout):
+    # bulk_create in chunks of `batch_size`, one transaction each, with the
+    # number of rows read checkpointed after every commit. import_data only
+    # starts on empty tables, so a conflict can only be a row of this import
+    # replayed after a crash between commit and checkpoint, and is skipped.
+    model = TABLES[table]
+    path = data_path(directory, table, fmt)
+    if not os.path.exists(path):
+        stdout.write(f"{table}: no {os.path.basename(path)}, skipping")
+        return
+    done = state.setdefault('tables', {}).get(table, 0)
+    decode = decoder(model, fmt)
+    throughput = Throughput(stdout, table, done)
+    batch = []
+
+    def flush():
+        with transaction.atomic():
+            model.objects.bulk_create(batch, ignore_conflicts=True)
+        state['tables'][table] = throughput.rows + len(batch)
+        write_state(state_path, state)
+        throughput.add(len(batch))
+        batch.clear()
+
+    with preserve_timestamps(model):
+        for index, record in enumerate(read_records(path, fmt)):
+            if index < done:
+                continue
+            batch.append(decode(record))
+            if len(batch) == batch_size:
+                flush()
+        if batch:
+            flush()
+    reset_sequences([model])
+    throughput.report(final=True)
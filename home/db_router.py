@@ -0,0 +1,125 @@
+import random
+import threading
+import time
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+from home.cache import load_backend
+
+# Set by ReplicaMiddleware for safe requests; everything else (writes, jobs,
+# management commands, shell) reads from the primary.
+_read_from_replica = ContextVar('read_from_replica', default=False)
+
+# user id -> pinned to the primary, expires DB_REPLICA_STICKY_SECONDS after the
+# user's last write. Shared between processes when POST_CACHE uses redis.
+pins = load_backend(settings.POST_CACHE)
+
+
+def pin_key(user_id):
+    return f"db-pin:{user_id}"
+
+
+class ReplicaHealth:
+    # Replicas that failed a connection check are skipped for
+    # DB_REPLICA_HEALTH_CHECK_INTERVAL seconds; a healthy one is re-checked at
+    # the same interval.
+
+    def __init__(self):
+        self._checked = {}
+        self._lock = threading.Lock()
+
+    def is_healthy(self, alias):
+        now = time.monotonic()
+        checked = self._checked.get(alias)
+        if checked is not None and now - checked[0] < settings.DB_REPLICA_HEALTH_CHECK_INTERVAL:
+            return checked[1]
+        healthy = self.check(alias)
+        with self._lock:
+            self._checked[alias] = (now, healthy)
+        if not healthy:
+            print(f"Database replica {alias} is unreachable, reading from the primary")
+        return healthy
+
+    def check(self, alias):
+        connection = connections[alias]
+        try:
+            connection.ensure_connection()
+            return connection.is_usable()
+        except DatabaseError:
+            connection.close()
+            return False
+
+    def reset(self):
+        with self._lock:
+            self._checked.clear()
+
+
+replica_health = ReplicaHealth()
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if not _read_from_replica.get():
+            return DEFAULT_DB_ALIAS
+        replicas = [alias for alias in settings.DATABASE_REPLICAS if replica_health.is_healthy(alias)]
+        return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replicas get their schema through replication
+        return db not in settings.DATABASE_REPLICAS
+
+
+def request_user_id(request):
+    # user id from the JWT, validated through the per-process token cache
+    from home.api.v1.authentication import CachedJWTAuthentication
+    authentication = CachedJWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None
+    try:
+        return authentication.get_validated_token(raw_token).user_id
+    except Exception:
+        return None
+
+
+class ReplicaMiddleware:
+    # Safe requests read from a replica unless the user wrote within the last
+    # DB_REPLICA_STICKY_SECONDS. Unsafe requests stay on the primary and pin
+    # the user there. Streamed rows are read after the request has returned
+    # and come from the primary.
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if settings.DB_CONN_HEALTH_CHECKS:
+            close_unusable_connections()
+        user_id = request_user_id(request) if settings.DATABASE_REPLICAS else None
+        safe = request.method in SAFE_METHODS
+        pinned = user_id is not None and bool(pins.get_many([pin_key(user_id)]))
+        token = _read_from_replica.set(bool(settings.DATABASE_REPLICAS) and safe and not pinned)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_from_replica.reset(token)
+        if user_id is not None and not safe and response.status_code < 500:
+            pins.set_many({pin_key(user_id): True}, ttl=settings.DB_REPLICA_STICKY_SECONDS)
+        return response
+
+
+def close_unusable_connections():
+    # Health check for persistent connections: ping every connection kept
+    # open from an earlier request and drop the broken ones before reuse
+    for connection in connections.all():
+        if connection.connection is not None and not connection.is_usable():
+            connection.close()
@@ -0,0 +1,73 @@
+from django.conf import settings
+from validate_email.dns_check import dns_check
+from validate_email.email_address import EmailAddress
+from validate_email.exceptions import (
+    AddressFormatError, AddressNotDeliverableError, DNSError, DNSTimeoutError,
+    EmailValidationError, NoNameserverError)
+from validate_email.smtp_check import smtp_check
+from home.cache import LocalBackend
+from home.constants import EMAIL_VALID, EMAIL_INVALID, EMAIL_UNKNOWN
+
+# transient DNS failures are raised so the job is retried, not cached
+RETRYABLE_DNS_ERRORS = (DNSTimeoutError, NoNameserverError)
+
+
+class FailedLookup:
+    # Cached for a domain whose MX lookup failed. Hits raise a new instance of
+    # the error class; re-raising one cached exception would keep growing its
+    # traceback and hold on to the frames of every job that hit it.
+
+    def __init__(self, error_class):
+        self.error_class = error_class
+
+
+class EmailVerifier:
+    # Full MX + SMTP verification, run from the job worker after signup.
+    # MX lookups are cached per domain since most signups share a few providers.
+
+    def __init__(self, config):
+        self.config = config
+        self.mx_cache = LocalBackend(config['MX_CACHE_SIZE'], config['MX_CACHE_TTL'])
+
+    def mx_records(self, email_address):
+        domain = email_address.domain_literal_ip or email_address.domain
+        cached = self.mx_cache.get_many([domain])
+        if domain in cached:
+            if isinstance(cached[domain], FailedLookup):
+                raise cached[domain].error_class()
+            return cached[domain]
+        try:
+            records = dns_check(email_address=email_address, timeout=self.config['DNS_TIMEOUT'])
+        except RETRYABLE_DNS_ERRORS:
+            raise
+        except DNSError as error:
+            self.mx_cache.set_many({domain: FailedLookup(type(error))})
+            raise
+        self.mx_cache.set_many({domain: records})
+        return records
+
+    def verify(self, email):
+        try:
+            email_address = EmailAddress(address=email)
+            mx_records = self.mx_records(email_address)
+        except RETRYABLE_DNS_ERRORS:
+            raise
+        except (AddressFormatError, DNSError):
+            return EMAIL_INVALID
+        try:
+            accepted = smtp_check(
+                email_address=email_address,
+                mx_records=mx_records,
+                timeout=self.config['SMTP_TIMEOUT'],
+                helo_host=self.config['HELO_HOST'],
+                from_address=EmailAddress(address=self.config['FROM_ADDRESS']),
+            )
+        except AddressNotDeliverableError:
+            return EMAIL_INVALID
+        except EmailValidationError:
+            # greylisting, temporary or communication errors: can't tell
+            return EMAIL_UNKNOWN
+        return EMAIL_VALID if accepted else EMAIL_UNKNOWN
+
+
+email_verifier = EmailVerifier(settings.EMAIL_VERIFICATION)
@@ -0,0 +1,47 @@
+import factory
+from django.contrib.auth.hashers import make_password
+from factory import fuzzy
+from home.constants import LIKE_CHOICES_LIST
+from home.models import Like, MyUser, Post
+
+# Every generated user logs in with this password. It is hashed once, hashing
+# per user would dominate the time it takes to build a large dataset.
+DEFAULT_PASSWORD = 'Bench1__'
+_password_hash = None
+
+
+def password_hash():
+    global _password_hash
+    if _password_hash is None:
+        _password_hash = make_password(DEFAULT_PASSWORD)
+    return _password_hash
+
+
+class UserFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = MyUser
+
+    username = factory.Sequence(lambda n: f"user_{n}")
+    email = factory.LazyAttribute(lambda user: f"{user.username}@example.com")
+    first_name = factory.Faker('first_name')
+    last_name = factory.Faker('last_name')
+    password = factory.LazyFunction(password_hash)
+    country_code = factory.Faker('country_code')
+
+
+class PostFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Post
+
+    author = factory.SubFactory(UserFactory)
+    body = factory.Faker('paragraph', nb_sentences=5)
+    active = True
+
+
+class LikeFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Like
+
+    user = factory.SubFactory(UserFactory)
+    post = factory.SubFactory(PostFactory)
+    value = fuzzy.FuzzyChoice(LIKE_CHOICES_LIST)
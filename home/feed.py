@@ -0,0 +1,58 @@
+from itertools import chain
+from django.conf import settings
+from django.db.models import Count, Q
+from home.models import FeedEntry, Follow, Post
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def fan_out_posts(post_ids):
+    # Write each post into its author's feed and the feeds of all followers,
+    # FAN_OUT_CHUNK rows per INSERT, then trim the feeds that were touched.
+    chunk_size = settings.FEED['FAN_OUT_CHUNK']
+    touched = set()
+    for post_id, author_id, created_at in Post.objects.filter(id__in=post_ids).values_list('id', 'author_id', 'created_at'):
+        followers = Follow.objects.filter(followee=author_id).values_list('follower_id', flat=True)
+        for user_ids in _chunks(chain([author_id], followers.iterator(chunk_size=chunk_size)), chunk_size):
+            FeedEntry.objects.bulk_create([
+                FeedEntry(user_id=user_id, post_id=post_id, author_id=author_id, created_at=created_at)
+                for user_id in user_ids
+            ], ignore_conflicts=True)
+            touched.update(user_ids)
+    trim_feeds(touched)
+
+
+def backfill_feed(user_id, author_id):
+    # a new follow pulls the author's latest posts into the follower's feed
+    posts = Post.objects.filter(author=author_id).order_by('-created_at', '-id').values_list('id', 'created_at')
+    FeedEntry.objects.bulk_create([
+        FeedEntry(user_id=user_id, post_id=post_id, author_id=author_id, created_at=created_at)
+        for post_id, created_at in posts[:settings.FEED['MAX_ENTRIES']]
+    ], ignore_conflicts=True)
+    trim_feeds([user_id])
+
+
+def remove_author_from_feed(user_id, author_id):
+    FeedEntry.objects.filter(user=user_id, author=author_id).delete()
+
+
+def trim_feeds(user_ids):
+    # Keep the newest MAX_ENTRIES entries per user. One grouped COUNT per chunk
+    # of users finds the feeds over the cap; only those are trimmed.
+    max_entries = settings.FEED['MAX_ENTRIES']
+    for user_ids in _chunks(user_ids, settings.FEED['FAN_OUT_CHUNK']):
+        over_cap = (FeedEntry.objects.filter(user__in=user_ids).order_by().values('user')
+                    .annotate(total=Count('id')).filter(total__gt=max_entries).values_list('user', flat=True))
+        for user_id in over_cap:
+            entries = FeedEntry.objects.filter(user=user_id)
+            created_at, entry_id = entries.order_by('-created_at', '-id').values_list('created_at', 'id')[max_entries]
+            entries.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lte=entry_id)).delete()
@@ -0,0 +1,139 @@
+import csv
+import ipaddress
+import threading
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+from django.conf import settings
+from home.cache import LocalBackend
+
+GeoLocation = namedtuple('GeoLocation', ['country_code', 'country_name', 'latitude', 'longitude'])
+
+# cached marker for "looked up, nothing found" so misses are not retried until the TTL
+NOT_FOUND = 'not-found'
+
+
+class GeoIndex:
+    # Sorted, array backed IP range index.
+    # IPv4 ranges live in unsigned 32 bit arrays; IPv6 ranges (rare in the range
+    # files we load) in plain int lists. A lookup is one bisect over the range starts,
+    # so ranges must not overlap, as in the usual country range files.
+
+    def __init__(self):
+        self.countries = []
+        self.v4 = self._table(array('I'), array('I'))
+        self.v6 = self._table([], [])
+
+    @staticmethod
+    def _table(starts, ends):
+        return {
+            'starts': starts,
+            'ends': ends,
+            'country': array('H'),
+            'latitude': array('f'),
+            'longitude': array('f'),
+        }
+
+    @classmethod
+    def from_csv(cls, path):
+        # One range per line: network,country_code,latitude,longitude[,country_name]
+        # e.g. "39.110.0.0/16,JP,35.69,139.69,Japan". Lines starting with # are skipped.
+        index = cls()
+        rows = {4: [], 6: []}
+        country_ids = {}
+        with open(path, newline='') as handle:
+            for row in csv.reader(handle):
+                if not row or row[0].startswith('#'):
+                    continue
+                network = ipaddress.ip_network(row[0].strip(), strict=False)
+                country = (row[1].strip().upper(), row[4].strip() if len(row) > 4 else row[1].strip().upper())
+                if country not in country_ids:
+                    country_ids[country] = len(index.countries)
+                    index.countries.append(country)
+                rows[network.version].append((
+                    int(network.network_address), int(network.broadcast_address),
+                    country_ids[country], float(row[2]), float(row[3]),
+                ))
+        for version, table in ((4, index.v4), (6, index.v6)):
+            for start, end, country, latitude, longitude in sorted(rows[version]):
+                table['starts'].append(start)
+                table['ends'].append(end)
+                table['country'].append(country)
+                table['latitude'].append(latitude)
+                table['longitude'].append(longitude)
+        return index
+
+    def __len__(self):
+        return len(self.v4['starts']) + len(self.v6['starts'])
+
+    def lookup(self, ip):
+        address = ipaddress.ip_address(ip)
+        table = self.v4 if address.version == 4 else self.v6
+        value = int(address)
+        position = bisect_right(table['starts'], value) - 1
+        if position < 0 or value > table['ends'][position]:
+            return None
+        country_code, country_name = self.countries[table['country'][position]]
+        # coordinates are stored as float32, round away the representation noise
+        return GeoLocation(country_code, country_name,
+                           round(table['latitude'][position], 4), round(table['longitude'][position], 4))
+
+
+class Geolocator:
+    # Local index first, TTL'd LRU of recent IPs in front of it and, only if
+    # enabled, the geolocation-db.com API as a fallback for IPs the index misses.
+
+    def __init__(self, config):
+        self.config = config
+        self.cache = LocalBackend(config['CACHE_SIZE'], config['CACHE_TTL'])
+        self._index = None
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def index(self):
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    path = self.config.get('DATABASE')
+                    self._index = GeoIndex.from_csv(path) if path else GeoIndex()
+        return self._index
+
+    def lookup(self, ip):
+        try:
+            address = ipaddress.ip_address(ip)
+        except (TypeError, ValueError):
+            return None
+        if not address.is_global:
+            return None
+        key = str(address)
+        cached = self.cache.get_many([key])
+        if key in cached:
+            return None if cached[key] == NOT_FOUND else cached[key]
+        location = self.index.lookup(key)
+        if location is None and self.config['REMOTE_FALLBACK']:
+            location = self.remote_lookup(key)
+        self.cache.set_many({key: location or NOT_FOUND})
+        return location
+
+    def remote_lookup(self, ip):
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            # one pooled keep-alive connection per job worker thread
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_maxsize=max(settings.JOB_QUEUE['CONCURRENCY'], 10))
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._session = session
+        response = self._session.get(self.config['REMOTE_URL'].format(ip=ip), timeout=self.config['REMOTE_TIMEOUT'])
+        if response.status_code != 200:
+            raise Exception(f"Can't fetch geolocation for ip address {ip}")
+        geolocation = response.json()
+        if geolocation['country_code'] == 'Not found':
+            return None
+        return GeoLocation(geolocation['country_code'], geolocation['country_name'],
+                           geolocation['latitude'], geolocation['longitude'])
+
+
+geolocator = Geolocator(settings.GEOLOCATION)
@@ -0,0 +1,67 @@
+import inspect
+import threading
+from datetime import date
+
+
+def country_key(name):
+    # "United States", "united-states" and the UnitedStates class all match
+    return ''.join(char for char in name.lower() if char.isalpha())
+
+
+class HolidayCalendar:
+    # Holiday dates memoized per (country_code, year), so enrichment and the
+    # daily refresh test membership in a frozenset instead of building a new
+    # holidays object per user.
+
+    def __init__(self):
+        self._years = {}
+        self._codes = None
+        self._lock = threading.Lock()
+
+    def holidays_for(self, country_code, year):
+        # frozenset of holiday dates, or None when the country is not supported
+        key = (country_code.upper(), year)
+        if key not in self._years:
+            # the holidays package is large, only load it once a lookup is needed
+            from holidays import country_holidays
+            try:
+                dates = frozenset(country_holidays(key[0], years=year).keys())
+            except NotImplementedError:
+                dates = None
+            with self._lock:
+                self._years[key] = dates
+        return self._years[key]
+
+    def country_code(self, country_name):
+        # ISO code for a country name such as MyUser.country, or None when the
+        # holidays package has no calendar for it
+        if self._codes is None:
+            from holidays import countries
+            from holidays.holiday_base import HolidayBase
+            # one class per country named after it, plus aliases for its codes
+            codes = {
+                country_key(name): cls.country for name, cls in vars(countries).items()
+                if inspect.isclass(cls) and issubclass(cls, HolidayBase) and getattr(cls, 'country', None)
+            }
+            with self._lock:
+                self._codes = codes
+        return self._codes.get(country_key(country_name or ''))
+
+    def is_holiday(self, country_code, day=None):
+        # True/False, or None for an unknown or unsupported country
+        if not country_code:
+            return None
+        day = day or date.today()
+        dates = self.holidays_for(country_code, day.year)
+        if dates is None:
+            return None
+        return day in dates
+
+    def warm(self, country_codes, years=None):
+        years = years or [date.today().year]
+        for country_code in country_codes:
+            for year in years:
+                self.holidays_for(country_code, year)
+
+
+holiday_calendar = HolidayCalendar()
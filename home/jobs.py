@@ -0,0 +1,169 @@
+import json
+import random
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from home.constants import JOB_PENDING, JOB_RUNNING, JOB_DONE, JOB_FAILED
+from home.models import Job
+
+# task name -> (perform, commit)
+TASKS = {}
+
+
+def register_task(name, commit=None):
+    # `perform(payload)` runs in the worker pool for each job and returns a result.
+    # `commit(results)` receives [(payload, result), ...] for the jobs of one batch
+    # that succeeded and applies them together, inside a transaction.
+    def decorator(perform):
+        TASKS[name] = (perform, commit)
+        return perform
+    return decorator
+
+
+def enqueue(task, payload, run_at=None, max_attempts=None):
+    # Call inside the transaction of the write that needs the job so both commit together.
+    return Job.objects.create(
+        task=task,
+        payload=json.dumps(payload),
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts or settings.JOB_QUEUE['MAX_ATTEMPTS'],
+    )
+
+
+def enqueue_many(task, payloads):
+    now = timezone.now()
+    return Job.objects.bulk_create([
+        Job(task=task, payload=json.dumps(payload), run_at=now, max_attempts=settings.JOB_QUEUE['MAX_ATTEMPTS'])
+        for payload in payloads
+    ])
+
+
+def backoff_delay(attempts):
+    # exponential backoff capped at BACKOFF_MAX, jittered over its upper half
+    config = settings.JOB_QUEUE
+    ceiling = min(config['BACKOFF_MAX'], config['BACKOFF_BASE'] * (2 ** attempts))
+    return random.uniform(ceiling / 2, ceiling)
+
+
+LEASE_EXPIRED = "Lease expired before the job finished (worker stopped or crashed)"
+
+
+def claim_jobs(limit):
+    # Lock a batch of due jobs and mark them running. Running jobs whose lease
+    # expired (worker died mid-batch) are picked up again, and that counts as
+    # an attempt: a job that crashes its worker must not be retried forever.
+    now = timezone.now()
+    lease_expired = now - timedelta(seconds=settings.JOB_QUEUE['LEASE_TIMEOUT'])
+    due = Q(status=JOB_PENDING, run_at__lte=now) | Q(status=JOB_RUNNING, locked_at__lt=lease_expired)
+    with transaction.atomic():
+        queryset = Job.objects.filter(due).order_by('run_at')
+        if connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        jobs = list(queryset[:limit])
+        expired = [job for job in jobs if job.status == JOB_RUNNING]
+        if expired:
+            Job.objects.filter(id__in=[job.id for job in expired]).update(
+                attempts=F('attempts') + 1, last_error=LEASE_EXPIRED, updated_at=now
+            )
+            for job in expired:
+                job.attempts += 1
+                job.last_error = LEASE_EXPIRED
+            exhausted = [job for job in expired if job.attempts >= job.max_attempts]
+            if exhausted:
+                Job.objects.filter(id__in=[job.id for job in exhausted]).update(status=JOB_FAILED, locked_at=None)
+                for job in exhausted:
+                    print(f"Job {job} attempt {job.attempts} failed: {LEASE_EXPIRED}")
+                jobs = [job for job in jobs if job not in exhausted]
+        if jobs:
+            Job.objects.filter(id__in=[job.id for job in jobs]).update(status=JOB_RUNNING, locked_at=now)
+    return jobs
+
+
+def perform_job(perform, payload):
+    # pool threads hold their own connections, checked around every job
+    close_old_connections()
+    try:
+        return perform(payload)
+    finally:
+        close_old_connections()
+
+
+class Worker:
+
+    def __init__(self, concurrency=None, batch_size=None):
+        config = settings.JOB_QUEUE
+        self.concurrency = concurrency or config['CONCURRENCY']
+        self.batch_size = batch_size or config['BATCH_SIZE']
+        self.pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="JobWorker")
+
+    def run(self, once=False, poll_interval=None):
+        poll_interval = poll_interval if poll_interval is not None else settings.JOB_QUEUE['POLL_INTERVAL']
+        try:
+            while True:
+                # a long running worker must not keep a broken or expired
+                # connection, as a request would not (CONN_MAX_AGE)
+                close_old_connections()
+                try:
+                    processed = self.run_batch()
+                finally:
+                    close_old_connections()
+                if once and not processed:
+                    return
+                if not processed:
+                    time.sleep(poll_interval)
+        finally:
+            self.pool.shutdown(wait=True)
+
+    def run_batch(self):
+        jobs = claim_jobs(self.batch_size)
+        by_task = {}
+        for job in jobs:
+            by_task.setdefault(job.task, []).append(job)
+        for task, task_jobs in by_task.items():
+            self.run_task(task, task_jobs)
+        return len(jobs)
+
+    def run_task(self, task, jobs):
+        if task not in TASKS:
+            for job in jobs:
+                self.fail(job, f"Unknown task {task}")
+            return
+        perform, commit = TASKS[task]
+        payloads = [json.loads(job.payload) for job in jobs]
+        futures = [self.pool.submit(perform_job, perform, payload) for payload in payloads]
+        succeeded = []
+        for job, payload, future in zip(jobs, payloads, futures):
+            try:
+                succeeded.append((job, payload, future.result()))
+            except Exception:
+                self.fail(job, traceback.format_exc())
+        if not succeeded:
+            return
+        try:
+            with transaction.atomic():
+                if commit is not None:
+                    commit([(payload, result) for _, payload, result in succeeded])
+                Job.objects.filter(id__in=[job.id for job, _, _ in succeeded]).update(
+                    status=JOB_DONE, locked_at=None, last_error=None, updated_at=timezone.now()
+                )
+        except Exception:
+            error = traceback.format_exc()
+            for job, _, _ in succeeded:
+                self.fail(job, error)
+
+    def fail(self, job, error):
+        job.attempts += 1
+        job.last_error = error
+        job.locked_at = None
+        if job.attempts >= job.max_attempts:
+            job.status = JOB_FAILED
+        else:
+            job.status = JOB_PENDING
+            job.run_at = timezone.now() + timedelta(seconds=backoff_delay(job.attempts))
+        job.save(update_fields=['attempts', 'last_error', 'locked_at', 'status', 'run_at', 'updated_at'])
+        print(f"Job {job} attempt {job.attempts} failed: {error}")
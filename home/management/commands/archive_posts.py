@@ -0,0 +1,30 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from home.archive import archive_cutoff, archive_posts
+
+
+class Command(BaseCommand):
+    help = ("Move posts older than ARCHIVE['AFTER_DAYS'] and their likes to the archive tables. "
+            "Meant to run on a schedule (cron, Heroku Scheduler); every batch commits, so a "
+            "stopped run is resumed by the next one.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help="Archive posts older than this many days (ARCHIVE['AFTER_DAYS'])")
+        parser.add_argument('--max-batches', type=int, default=None,
+                            help="Stop after this many batches, to fit a maintenance window")
+
+    def handle(self, *args, **options):
+        if options['days'] is not None:
+            cutoff = timezone.now() - timedelta(days=options['days'])
+        else:
+            cutoff = archive_cutoff()
+        started = time.perf_counter()
+
+        def report(moved):
+            self.stdout.write(f"{moved} posts archived, {moved / max(time.perf_counter() - started, 1e-9):.0f} posts/s")
+
+        moved = archive_posts(cutoff, max_batches=options['max_batches'], on_batch=report)
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} posts created before {cutoff.isoformat()}"))
@@ -0,0 +1,66 @@
+import json
+import random
+import factory.random
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from home.benchmarks import SCENARIOS, BenchmarkContext, compare_with_baseline, private_caches, run_benchmarks, seed
+
+
+class Command(BaseCommand):
+    help = "Benchmark the v1 API endpoints (latency percentiles, throughput, SQL queries) on a generated dataset"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help="Users in the generated dataset")
+        parser.add_argument('--posts-per-user', type=int, default=20)
+        parser.add_argument('--likes-per-user', type=int, default=50)
+        parser.add_argument('--requests', type=int, default=200, help="Measured requests per endpoint")
+        parser.add_argument('--warmup', type=int, default=10, help="Unmeasured requests per endpoint")
+        parser.add_argument('--scenario', action='append', dest='scenarios',
+                            choices=[scenario.name for scenario in SCENARIOS],
+                            help="Only run these endpoints (repeatable)")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--save-baseline', metavar='PATH', help="Write the results as a JSON baseline")
+        parser.add_argument('--baseline', metavar='PATH', help="Fail when results regress against this baseline")
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help="Allowed p95 slowdown against the baseline, as a ratio")
+
+    def handle(self, *args, **options):
+        # runs against a throwaway test database, never the configured one
+        rng = random.Random(options['seed'])
+        factory.random.reseed_random(options['seed'])
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with private_caches():
+                self.stdout.write(
+                    f"Seeding {options['users']} users, {options['posts_per_user']} posts and "
+                    f"{options['likes_per_user']} likes per user..."
+                )
+                users, post_ids = seed(options['users'], options['posts_per_user'], options['likes_per_user'], rng)
+                context = BenchmarkContext(users[0], post_ids, rng)
+                results = run_benchmarks(context, options['requests'], options['scenarios'], options['warmup'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.report(results)
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w') as baseline_file:
+                json.dump(results, baseline_file, indent=2, sort_keys=True)
+            self.stdout.write(f"Baseline saved to {options['save_baseline']}")
+        if options['baseline']:
+            with open(options['baseline']) as baseline_file:
+                regressions = compare_with_baseline(results, json.load(baseline_file), options['tolerance'])
+            if regressions:
+                raise CommandError("Performance regressions:\n" + "\n".join(regressions))
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline"))
+
+    def report(self, results):
+        self.stdout.write(f"{'endpoint':<16}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'queries':>9}{'errors':>8}")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<16}{result['p50_ms']:>10}{result['p95_ms']:>10}{result['p99_ms']:>10}"
+                f"{result['throughput_rps']:>10}{result['queries_max']:>9}{result['errors']:>8}"
+            )
@@ -0,0 +1,114 @@
+import http.client
+import logging
+import os
+import random
+import resource
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import factory.random
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from rest_framework_simplejwt.tokens import RefreshToken
+from home.benchmarks import percentile, private_caches, seed
+
+
+def rss_mb():
+    # current resident set size, peak RSS where /proc is not available
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Command(BaseCommand):
+    help = "Compare throughput, latency and memory of the waitress server at several thread counts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, nargs='+', default=[4, 8, 16, 32],
+                            help="waitress thread counts to compare (4 is the waitress default)")
+        parser.add_argument('--clients', type=int, default=32, help="Concurrent keep-alive clients")
+        parser.add_argument('--duration', type=float, default=5.0, help="Seconds of load per thread count")
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--posts-per-user', type=int, default=20)
+        parser.add_argument('--likes-per-user', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        # One process serves and loads itself, so client threads share the GIL
+        # with the server: the numbers are for comparing thread counts against
+        # each other, not absolute capacity.
+        rng = random.Random(options['seed'])
+        factory.random.reseed_random(options['seed'])
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with private_caches():
+                users, post_ids = seed(options['users'], options['posts_per_user'], options['likes_per_user'], rng)
+                token = RefreshToken.for_user(users[0]).access_token
+                paths = [
+                    '/api/v1/posts/',
+                    *[f'/api/v1/posts/{post_id}/' for post_id in rng.sample(post_ids, min(50, len(post_ids)))],
+                    *[f'/api/v1/post-reactions/{post_id}' for post_id in rng.sample(post_ids, min(50, len(post_ids)))],
+                    f'/api/v1/user-posts/{users[0].id}',
+                ]
+                application = get_wsgi_application()
+                # queue depth warnings are expected while the server is saturated
+                logging.getLogger('waitress.queue').setLevel(logging.ERROR)
+                self.stdout.write(f"{'threads':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}{'rss MB':>10}")
+                for threads in options['threads']:
+                    result = self.measure(application, threads, options['clients'], options['duration'], paths, f"Bearer {token}")
+                    self.stdout.write(
+                        f"{threads:>8}{result['throughput_rps']:>10}{result['p50_ms']:>10}{result['p95_ms']:>10}"
+                        f"{result['p99_ms']:>10}{result['errors']:>8}{result['rss_mb']:>10}"
+                    )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def measure(self, application, threads, clients, duration, paths, authorization):
+        from waitress.server import create_server
+        server = create_server(application, host='127.0.0.1', port=0, threads=threads, _start=True)
+        server_thread = threading.Thread(target=server.run, daemon=True)
+        server_thread.start()
+        deadline = time.perf_counter() + duration
+
+        def client(index):
+            latencies, errors = [], 0
+            conn = http.client.HTTPConnection('127.0.0.1', server.effective_port, timeout=30)
+            picker = random.Random(index)
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    conn.request('GET', picker.choice(paths), headers={'Authorization': authorization})
+                    response = conn.getresponse()
+                    response.read()
+                    if response.status != 200:
+                        errors += 1
+                except (OSError, http.client.HTTPException):
+                    errors += 1
+                    conn.close()
+                    conn = http.client.HTTPConnection('127.0.0.1', server.effective_port, timeout=30)
+                latencies.append(time.perf_counter() - started)
+            conn.close()
+            return latencies, errors
+
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            results = list(pool.map(client, range(clients)))
+        memory = rss_mb()
+        server.close()
+        server.task_dispatcher.shutdown()
+        server_thread.join(timeout=5)
+        latencies = sorted(latency for client_latencies, _ in results for latency in client_latencies)
+        return {
+            'throughput_rps': round(len(latencies) / duration, 1),
+            'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+            'errors': sum(errors for _, errors in results),
+            'rss_mb': round(memory, 1),
+        }
@@ -0,0 +1,69 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from home.api.v1.serializers import LikeSerializer, PostSerializer, like_rows, post_rows
+from home.models import Like, MyUser, Post
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Compare rows/second of the ModelSerializer and values_list read paths for posts and likes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                            help="Row counts to serialize")
+        parser.add_argument('--repeat', type=int, default=3,
+                            help="Runs per measurement, the best one is reported")
+
+    def handle(self, *args, **options):
+        # rows are created in a transaction that is rolled back afterwards
+        try:
+            with transaction.atomic():
+                self.seed(max(options['sizes']))
+                for name, model, serializer_class, fast in (
+                    ('posts', Post, PostSerializer, post_rows),
+                    ('likes', Like, LikeSerializer, like_rows),
+                ):
+                    for size in options['sizes']:
+                        self.compare(name, model.objects.order_by('id')[:size], serializer_class, fast, size, options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, size):
+        self.stdout.write(f"Seeding {size} posts and likes...")
+        users = [MyUser(username=f"benchmark_{i}", password="!") for i in range(2)]
+        for user in users:
+            user.save()
+        posts = [Post(author=users[0], body=f"Benchmark post {i}", active=True) for i in range(size)]
+        Post.objects.bulk_create(posts)
+        post_ids = Post.objects.filter(author=users[0]).values_list('id', flat=True)
+        Like.objects.bulk_create([
+            Like(user=users[1], post_id=post_id, value='Like' if post_id % 3 else 'Unlike')
+            for post_id in post_ids.iterator()
+        ])
+
+    def best(self, run, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = run()
+            timings.append(time.perf_counter() - started)
+        return min(timings), result
+
+    def compare(self, name, queryset, serializer_class, fast, size, repeat):
+        renderer = JSONRenderer()
+        slow_time, slow = self.best(lambda: serializer_class(queryset, many=True).data, repeat)
+        fast_time, rows = self.best(lambda: fast.serialize(queryset), repeat)
+        identical = renderer.render(slow) == renderer.render(rows)
+        self.stdout.write(
+            f"{name:>5} {size:>7} rows: ModelSerializer {size / slow_time:>10.0f} rows/s, "
+            f"values_list {size / fast_time:>10.0f} rows/s, x{slow_time / fast_time:.1f}, "
+            f"identical output: {identical}"
+        )
+        if not identical:
+            self.stderr.write(self.style.ERROR(f"{name}: fast path output differs"))
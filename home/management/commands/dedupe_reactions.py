@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Max
+from home.models import Like
+
+
+class Command(BaseCommand):
+    help = ("Keep only the latest reaction per (user, post) so the (user, post) unique "
+            "constraint can be applied. Run before migrate; when duplicates were removed, "
+            "run rebuild_reaction_counts after migrate.")
+
+    def handle(self, *args, **options):
+        if Like._meta.db_table not in connection.introspection.table_names():
+            self.stdout.write("No reactions table yet, nothing to deduplicate")
+            return
+        with transaction.atomic():
+            latest = Like.objects.order_by().values('user', 'post').annotate(latest=Max('id')).values('latest')
+            deleted, _ = Like.objects.exclude(id__in=latest).delete()
+        self.stdout.write(self.style.SUCCESS(f"Removed {deleted} duplicate reactions"))
+        if deleted:
+            # the counter columns may not exist before migrate, so the rebuild is left to the caller
+            self.stdout.write("Run `manage.py rebuild_reaction_counts` after migrate to fix the post reaction counters")
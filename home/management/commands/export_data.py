@@ -0,0 +1,38 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from home.data_transfer import EXPORT_STATE, FORMATS, TABLES, export_table, parse_moment, read_state
+
+
+class Command(BaseCommand):
+    help = ("Stream users, posts and likes, live and archived, to one NDJSON or CSV file per table in DIRECTORY. "
+            "The users file holds password hashes, keep it private.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory')
+        parser.add_argument('--format', choices=FORMATS, default='ndjson')
+        parser.add_argument('--tables', nargs='+', choices=list(TABLES), default=list(TABLES))
+        parser.add_argument('--since', type=parse_moment, help="Only posts created at or after this date/datetime, their likes and the users involved")
+        parser.add_argument('--until', type=parse_moment, help="Only posts created before this date/datetime, their likes and the users involved")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows fetched and checkpointed at a time")
+        parser.add_argument('--resume', action='store_true', help="Continue an interrupted export into DIRECTORY")
+
+    def handle(self, *args, **options):
+        directory = options['directory']
+        os.makedirs(directory, exist_ok=True)
+        state_path = os.path.join(directory, EXPORT_STATE)
+        run = {
+            'format': options['format'],
+            'since': options['since'] and options['since'].isoformat(),
+            'until': options['until'] and options['until'].isoformat(),
+        }
+        state = read_state(state_path) if options['resume'] else {}
+        if options['resume'] and not state:
+            raise CommandError(f"Nothing to resume in {directory}")
+        if state and state['run'] != run:
+            raise CommandError(f"{directory} holds an export with other options: {state['run']}")
+        state['run'] = run
+        for table in TABLES:
+            if table in options['tables']:
+                export_table(directory, table, options['format'], options['batch_size'],
+                             options['since'], options['until'], state, state_path, self.stdout)
+        self.stdout.write(self.style.SUCCESS(f"Exported {', '.join(options['tables'])} to {directory}"))
@@ -0,0 +1,38 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from home.cache import post_cache
+from home.data_transfer import FORMATS, IMPORT_STATE, TABLES, import_table, read_state
+
+
+class Command(BaseCommand):
+    help = ("Load the files written by export_data into empty tables with chunked bulk inserts, "
+            "keeping their ids.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory')
+        parser.add_argument('--format', choices=FORMATS, default='ndjson')
+        parser.add_argument('--tables', nargs='+', choices=list(TABLES), default=list(TABLES))
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows inserted per transaction")
+        parser.add_argument('--resume', action='store_true', help="Continue an interrupted import from DIRECTORY")
+
+    def handle(self, *args, **options):
+        directory = options['directory']
+        if not os.path.isdir(directory):
+            raise CommandError(f"No such directory: {directory}")
+        state_path = os.path.join(directory, IMPORT_STATE)
+        state = read_state(state_path) if options['resume'] else {}
+        if state and state['format'] != options['format']:
+            raise CommandError(f"{directory} holds a {state['format']} import, pass --format {state['format']}")
+        state['format'] = options['format']
+        if not options['resume']:
+            # Imported rows keep their ids and foreign keys, so a user skipped on a
+            # clash would hand their posts and likes to whoever owns that id
+            occupied = [table for table in options['tables'] if TABLES[table]._base_manager.exists()]
+            if occupied:
+                raise CommandError(f"Refusing to import into non-empty tables: {', '.join(occupied)}")
+        for table in TABLES:
+            if table in options['tables']:
+                import_table(directory, table, options['format'], options['batch_size'], state, state_path, self.stdout)
+        # cached payloads may belong to ids that were just imported
+        post_cache.clear()
+        self.stdout.write(self.style.SUCCESS(f"Imported {', '.join(options['tables'])} from {directory}"))
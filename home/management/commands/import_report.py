@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+from django.core.management.base import BaseCommand, CommandError
+
+# What a web process imports before serving its first request
+STARTUP_SCRIPT = """
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+"""
+
+# Only needed by the job worker or on first use, never at web startup
+DEFERRED_MODULES = ['holidays', 'validate_email', 'google.cloud.secretmanager']
+
+
+def parse_importtime(output):
+    # `python -X importtime` stderr -> [(module, self_us, cumulative_us, depth)]
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return modules
+
+
+class Command(BaseCommand):
+    help = "Report the import time of a web process startup and fail on regressions"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20, help="Slowest top-level imports to list")
+        parser.add_argument('--max-total-ms', type=float, help="Fail when startup imports take longer")
+        parser.add_argument('--forbid', action='append', default=None,
+                            help=f"Module that must not be imported at startup (default: {', '.join(DEFERRED_MODULES)})")
+
+    def handle(self, *args, **options):
+        # a fresh interpreter, this one already has everything imported
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'tradecore.settings'))
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+            env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True,
+        )
+        modules = parse_importtime(result.stderr)
+        if result.returncode != 0:
+            errors = '\n'.join(line for line in result.stderr.splitlines() if not line.startswith('import time:'))
+            raise CommandError(f"Startup failed:\n{errors}")
+
+        top_level = sorted((module for module in modules if module[3] == 0), key=lambda module: -module[2])
+        total_ms = sum(module[2] for module in top_level) / 1000
+        self.stdout.write(f"{'module':<60}{'cumulative ms':>15}")
+        for name, _, cumulative_us, _ in top_level[:options['top']]:
+            self.stdout.write(f"{name:<60}{cumulative_us / 1000:>15.1f}")
+        self.stdout.write(f"Total import time: {total_ms:.1f}ms over {len(modules)} modules")
+
+        problems = []
+        imported = {module[0] for module in modules}
+        for name in options['forbid'] or DEFERRED_MODULES:
+            if name in imported:
+                problems.append(f"{name} is imported at startup")
+        if options['max_total_ms'] is not None and total_ms > options['max_total_ms']:
+            problems.append(f"startup imports took {total_ms:.1f}ms, over the {options['max_total_ms']}ms budget")
+        if problems:
+            raise CommandError("Import time regressions:\n" + "\n".join(problems))
+        self.stdout.write(self.style.SUCCESS("No deferred module imported at startup"))
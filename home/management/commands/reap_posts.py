@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from home.models import Post
+from home.reaper import reap_post
+
+
+class Command(BaseCommand):
+    help = ("Delete every soft-deleted post and its reactions in batches, "
+            "e.g. after reap_post jobs failed or to clear a backlog without the worker")
+
+    def handle(self, *args, **options):
+        post_ids = list(Post.all_objects.exclude(deleted_at=None).values_list('id', flat=True))
+        for post_id in post_ids:
+            while not reap_post(post_id):
+                pass
+        self.stdout.write(self.style.SUCCESS(f"Reaped {len(post_ids)} deleted posts"))
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from home.cache import post_cache
+from home.constants import LIKE_CHOICES_LIST
+from home.models import Like, Post
+from home.reactions import COUNTER_FIELDS
+
+
+class Command(BaseCommand):
+    help = "Rebuild Post.like_count / Post.unlike_count from the Like table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Number of posts recomputed per UPDATE statement")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        counters = {
+            COUNTER_FIELDS[value]: Coalesce(Subquery(
+                Like.objects.filter(post=OuterRef('pk'), value=value)
+                    .order_by().values('post').annotate(total=Count('id')).values('total'),
+                output_field=IntegerField(),
+            ), 0)
+            for value in LIKE_CHOICES_LIST
+        }
+        # updated_at is shown in the API and feeds the ETags, so only posts whose
+        # stored counters are off are touched
+        recounted = {f"recounted_{field}": expression for field, expression in counters.items()}
+        stale = Q()
+        for field in counters:
+            stale |= ~Q(**{field: F(f"recounted_{field}")})
+        last_id = 0
+        checked = updated = 0
+        while True:
+            ids = list(Post.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                stale_ids = list(
+                    Post.objects.filter(id__gte=ids[0], id__lte=ids[-1]).annotate(**recounted).filter(stale).values_list('id', flat=True)
+                )
+                if stale_ids:
+                    updated += Post.objects.filter(id__in=stale_ids).update(updated_at=timezone.now(), **counters)
+                    post_cache.invalidate(*stale_ids)
+            checked += len(ids)
+            last_id = ids[-1]
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt reaction counters for {updated} of {checked} posts"))
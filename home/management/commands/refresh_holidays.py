@@ -0,0 +1,44 @@
+from datetime import date
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from home.holiday_calendar import holiday_calendar
+from home.models import MyUser
+
+
+class Command(BaseCommand):
+    help = ("Recompute MyUser.holiday for every user, grouped by country (run daily). "
+            "Users with a country but no country_code get the code first.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat, default=None,
+                            help="Day to evaluate, YYYY-MM-DD (defaults to today)")
+
+    def handle(self, *args, **options):
+        day = options['date'] or date.today()
+        backfilled = self.backfill_country_codes()
+        country_codes = MyUser.objects.exclude(country_code=None).order_by().values_list('country_code', flat=True).distinct()
+        # holiday value -> countries, so each distinct value costs one UPDATE
+        groups = {True: [], False: [], None: []}
+        for country_code in country_codes:
+            groups[holiday_calendar.is_holiday(country_code, day)].append(country_code)
+        updated = 0
+        with transaction.atomic():
+            for is_holiday, codes in groups.items():
+                if codes:
+                    updated += MyUser.objects.filter(country_code__in=codes).update(holiday=is_holiday)
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed holiday for {updated} users in {sum(len(codes) for codes in groups.values())} countries for {day}"
+            f" ({backfilled} country codes backfilled)"
+        ))
+
+    def backfill_country_codes(self):
+        # Users enriched before country_code existed only have the country
+        # name; one UPDATE per distinct name. Names with no known code are left
+        # alone and keep holiday unset.
+        names = MyUser.objects.filter(country_code=None).exclude(country=None).order_by().values_list('country', flat=True).distinct()
+        backfilled = 0
+        for name in names:
+            country_code = holiday_calendar.country_code(name)
+            if country_code:
+                backfilled += MyUser.objects.filter(country=name, country_code=None).update(country_code=country_code)
+        return backfilled
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from home.holiday_calendar import holiday_calendar
+from home.jobs import Worker
+from home.models import MyUser
+import home.tasks  # noqa: F401 registers the task handlers
+
+
+class Command(BaseCommand):
+    help = "Run the background job worker"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=None,
+                            help="Size of the worker thread pool (JOB_QUEUE['CONCURRENCY'])")
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help="Jobs claimed per batch (JOB_QUEUE['BATCH_SIZE'])")
+        parser.add_argument('--once', action='store_true',
+                            help="Exit once no job is due instead of polling")
+
+    def handle(self, *args, **options):
+        # precompute this year's holidays for every country we already have users in
+        holiday_calendar.warm(self.known_country_codes())
+        worker = Worker(concurrency=options['concurrency'], batch_size=options['batch_size'])
+        self.stdout.write(f"Job worker started with {worker.concurrency} threads, batches of {worker.batch_size}")
+        worker.run(once=options['once'])
+
+    def known_country_codes(self):
+        return MyUser.objects.exclude(country_code=None).order_by().values_list('country_code', flat=True).distinct()
@@ -0,0 +1,158 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+from django.conf import settings
+from django.db import connections
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    # Prometheus histogram per label set. Only the matching bucket is
+    # incremented on observe; counts are made cumulative when rendered.
+
+    def __init__(self, name, help_text, labels, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, label_values, value):
+        series = self.series.get(label_values)
+        if series is None:
+            series = self.series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_values, (bucket_counts, total, count) in sorted(self.series.items()):
+            labels = format_labels(self.labels, label_values)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ('+Inf',), bucket_counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {count}")
+        return lines
+
+
+class Counter:
+
+    def __init__(self, name, help_text, labels):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.series = {}
+
+    def inc(self, label_values, amount=1):
+        self.series[label_values] = self.series.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self.series.items()):
+            lines.append(f"{self.name}{{{format_labels(self.labels, label_values)}}} {value}")
+        return lines
+
+
+def format_labels(names, values):
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in values)
+    return ','.join(f'{name}="{value}"' for name, value in zip(names, escaped))
+
+
+class RequestMetrics:
+    # Per process aggregates of every request, rendered for Prometheus by the
+    # metrics endpoint. Each worker process exposes its own numbers.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.duration = Histogram('tradecore_http_request_duration_seconds', "Request latency",
+                                  ('route', 'method', 'status'), LATENCY_BUCKETS)
+        self.queries = Histogram('tradecore_http_request_queries', "SQL queries per request",
+                                 ('route', 'method'), QUERY_COUNT_BUCKETS)
+        self.query_duration = Histogram('tradecore_http_request_query_duration_seconds', "SQL time per request",
+                                        ('route', 'method'), LATENCY_BUCKETS)
+        self.response_size = Histogram('tradecore_http_response_size_bytes', "Response body size",
+                                       ('route', 'method'), SIZE_BUCKETS)
+        self.over_budget = Counter('tradecore_http_requests_over_query_budget_total',
+                                   "Requests that ran more SQL queries than METRICS['QUERY_BUDGET']",
+                                   ('route', 'method'))
+
+    def observe(self, route, method, status, duration, queries, query_duration, size):
+        with self._lock:
+            self.duration.observe((route, method, str(status)), duration)
+            self.queries.observe((route, method), queries)
+            self.query_duration.observe((route, method), query_duration)
+            if size is not None:
+                self.response_size.observe((route, method), size)
+            if queries > settings.METRICS['QUERY_BUDGET']:
+                self.over_budget.inc((route, method))
+
+    def render(self, extra=()):
+        with self._lock:
+            lines = []
+            for metric in (self.duration, self.queries, self.query_duration, self.response_size, self.over_budget):
+                lines += metric.render()
+        lines += extra
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            for metric in (self.duration, self.queries, self.query_duration, self.response_size, self.over_budget):
+                metric.series.clear()
+
+
+request_metrics = RequestMetrics()
+
+
+class QueryCounter:
+    # connection.execute_wrapper hook counting and timing SQL statements
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+def route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match.route
+
+
+class MetricsMiddleware:
+    # Records latency, SQL query count/time and response size per route.
+    # Streaming responses are measured up to the first byte, their rows are
+    # read after the middleware returns.
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+        route = route_name(request)
+        size = None if response.streaming else len(response.content)
+        request_metrics.observe(route, request.method, response.status_code, duration, counter.count, counter.duration, size)
+        budget = settings.METRICS['QUERY_BUDGET']
+        if counter.count > budget:
+            print(f"{request.method} {request.path} ({route}) ran {counter.count} SQL queries, over the budget of {budget}")
+        return response
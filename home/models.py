@@ -8,7 +8,17 @@ class MyUser(AbstractUser):
     latitude = models.FloatField(null=True,)
     longitude = models.FloatField(null=True,)
     country = models.TextField(null=True, blank=True)
+    country_code = models.CharField(max_length=2, null=True, blank=True, db_index=True)
     holiday = models.TextField(null=True, blank=True)
+    # MX/SMTP verification runs after signup, see home.email_verification
+    email_verification = models.CharField(choices=EMAIL_VERIFICATION_CHOICES, default=EMAIL_PENDING, max_length=10)
+
+class LivePostManager(models.Manager):
+    # Post.objects: soft-deleted posts and posts on their way to the archive
+    # are left out of every query
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at=None, archived_at=None)
+
 
 class Post(models.Model):
     id = models.AutoField(primary_key=True)
@@ -16,8 +26,27 @@ class Post(models.Model):
     body = models.TextField(blank=False)
     # liked = models.ManyToManyField(MyUser, default=None, blank=True, related_name='liked')
     active = models.BooleanField(blank=False)
+    # denormalized reaction counters, maintained by home.reactions
+    like_count = models.IntegerField(default=0)
+    unlike_count = models.IntegerField(default=0)
     created_at = models.DateTimeField('%m/%d/%Y %H:%M:%S', auto_now_add=True)
     updated_at = models.DateTimeField('%m/%d/%Y %H:%M:%S', auto_now=True)
+    # set by PostViewSet.destroy; the row and its reactions are deleted later
+    # in small batches by the reap_post job (home.reaper)
+    deleted_at = models.DateTimeField(null=True, blank=True)
+    # set once the row has been copied to ArchivedPost, while `archive_posts`
+    # moves its likes (home.archive)
+    archived_at = models.DateTimeField(null=True, blank=True)
+
+    objects = LivePostManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            # keyset pagination for the global and per-author listings
+            models.Index(fields=['created_at', 'id'], name='post_created_id_idx'),
+            models.Index(fields=['author', 'created_at', 'id'], name='post_author_created_id_idx'),
+        ]
 
     def __str__(self):
         return str(self.body)
@@ -29,10 +58,105 @@ class Like(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE)
     value = models.CharField(choices=LIKE_CHOICES, default='Like', max_length=10)
 
+    class Meta:
+        # one reaction per user and post, written with an upsert (home.reactions)
+        unique_together = [
+            ['user', 'post']
+        ]
+
+    def __str__(self):
+        return str(self.post)
+
+
+class Follow(models.Model):
+    id = models.AutoField(primary_key=True)
+    follower = models.ForeignKey(MyUser, on_delete=models.CASCADE, related_name='following')
+    followee = models.ForeignKey(MyUser, on_delete=models.CASCADE, related_name='followers')
+    created_at = models.DateTimeField('%m/%d/%Y %H:%M:%S', auto_now_add=True)
+
+    class Meta:
+        unique_together = [
+            ['follower', 'followee']
+        ]
+        indexes = [
+            # fan-out reads the followers of an author
+            models.Index(fields=['followee', 'follower'], name='follow_followee_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.follower} -> {self.followee}"
+
+
+class FeedEntry(models.Model):
+    # Materialized home feed row, written by the fan-out in home.feed.
+    # created_at is copied from the post so a feed page is one range scan.
+    id = models.AutoField(primary_key=True)
+    user = models.ForeignKey(MyUser, on_delete=models.CASCADE, related_name='feed_entries')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE)
+    author = models.ForeignKey(MyUser, on_delete=models.CASCADE, related_name='+')
+    created_at = models.DateTimeField()
+
     class Meta:
         unique_together = [
-            ['user', 'post', 'value']
+            ['user', 'post']
+        ]
+        indexes = [
+            models.Index(fields=['user', 'created_at', 'id'], name='feed_user_created_id_idx'),
         ]
 
+    def __str__(self):
+        return f"{self.user} <- {self.post}"
+
+
+class ArchivedPost(models.Model):
+    # Posts older than ARCHIVE['AFTER_DAYS'], moved here with their ids by
+    # `manage.py archive_posts` (home.archive) and read back by PostViewSet.retrieve
+    id = models.IntegerField(primary_key=True)
+    author = models.ForeignKey(MyUser, on_delete=models.CASCADE, related_name='+')
+    body = models.TextField()
+    active = models.BooleanField()
+    like_count = models.IntegerField(default=0)
+    unlike_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='archived_post_created_id_idx'),
+        ]
+
+    def __str__(self):
+        return str(self.body)
+
+
+class ArchivedLike(models.Model):
+    id = models.IntegerField(primary_key=True)
+    user = models.ForeignKey(MyUser, on_delete=models.CASCADE, related_name='+')
+    post = models.ForeignKey(ArchivedPost, on_delete=models.CASCADE)
+    value = models.CharField(choices=LIKE_CHOICES, default='Like', max_length=10)
+
     def __str__(self):
         return str(self.post)
+
+
+class Job(models.Model):
+    # Durable background job, picked up by `manage.py run_jobs`
+    id = models.AutoField(primary_key=True)
+    task = models.CharField(max_length=100)
+    payload = models.TextField(default='{}')
+    status = models.CharField(choices=JOB_STATUS_CHOICES, default=JOB_PENDING, max_length=10)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='job_status_run_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.id} ({self.status})"
@@ -0,0 +1,123 @@
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+from home.models import Like, Post
+from home.cache import post_cache
+
+# Like.value -> counter column on Post
+COUNTER_FIELDS = {
+    'Like': 'like_count',
+    'Unlike': 'unlike_count',
+}
+
+
+def apply_reaction_change(post_id, added=None, removed=()):
+    # Adjust the denormalized counters on a post for one reaction write.
+    # `added` is the value that was inserted (if any) and `removed` the values
+    # that were deleted. Must run in the same transaction as the Like write.
+    deltas = {}
+    if added:
+        deltas[added] = deltas.get(added, 0) + 1
+    for value in removed:
+        deltas[value] = deltas.get(value, 0) - 1
+    apply_reaction_deltas({post_id: deltas})
+
+
+def apply_reaction_deltas(deltas_by_post):
+    # {post_id: {value: delta}} -> a single UPDATE over all touched posts
+    updates = {}
+    for value, field in COUNTER_FIELDS.items():
+        whens = [
+            When(id=post_id, then=Value(deltas[value]))
+            for post_id, deltas in deltas_by_post.items() if deltas.get(value)
+        ]
+        if whens:
+            updates[field] = F(field) + Case(*whens, default=Value(0), output_field=IntegerField())
+    if updates:
+        # counters are part of the post payload, so they move its ETag/Last-Modified too
+        updates['updated_at'] = timezone.now()
+        post_ids = list(deltas_by_post)
+        Post.objects.filter(id__in=post_ids).update(**updates)
+        post_cache.invalidate(*post_ids)
+
+
+def upsert_reactions(user_id, reactions):
+    # Set the user's reaction on each post in `reactions` ({post_id: value}) and
+    # keep the counters in step. Relies on the (user, post) unique constraint, so
+    # concurrent taps end in exactly one row per user and post.
+    # Returns {post_id: (like_id, previous_value)}; previous_value is None for new rows.
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            results = _upsert_postgresql(user_id, reactions)
+        else:
+            results = _upsert_generic(user_id, reactions)
+        deltas = {}
+        for post_id, (like_id, previous) in results.items():
+            value = reactions[post_id]
+            if previous == value:
+                continue
+            deltas[post_id] = {value: 1}
+            if previous is not None:
+                deltas[post_id][previous] = -1
+        apply_reaction_deltas(deltas)
+    return results
+
+
+def _like_columns():
+    quote = connection.ops.quote_name
+    fields = Like._meta
+    return (
+        quote(fields.db_table),
+        quote(fields.get_field('user').column),
+        quote(fields.get_field('post').column),
+        quote(fields.get_field('value').column),
+    )
+
+
+def _upsert_postgresql(user_id, reactions):
+    # One INSERT ... ON CONFLICT DO UPDATE for the whole batch. Rows whose value
+    # is unchanged are not touched (and not returned); for switched rows the
+    # previous value is the other choice since reactions are binary.
+    table, user, post, value = _like_columns()
+    rows = ', '.join(['(%s, %s, %s)'] * len(reactions))
+    params = [param for post_id, reaction in reactions.items() for param in (user_id, post_id, reaction)]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({user}, {post}, {value}) VALUES {rows} "
+            f"ON CONFLICT ({user}, {post}) DO UPDATE SET {value} = EXCLUDED.{value} "
+            f"WHERE {table}.{value} <> EXCLUDED.{value} "
+            f"RETURNING id, {post}, xmax = 0",
+            params,
+        )
+        changed = cursor.fetchall()
+    results = {}
+    for like_id, post_id, inserted in changed:
+        reaction = reactions[post_id]
+        results[post_id] = (like_id, None if inserted else next(v for v in COUNTER_FIELDS if v != reaction))
+    unchanged = [post_id for post_id in reactions if post_id not in results]
+    if unchanged:
+        for post_id, like_id in Like.objects.filter(user_id=user_id, post_id__in=unchanged).values_list('post_id', 'id'):
+            results[post_id] = (like_id, reactions[post_id])
+    return results
+
+
+def _upsert_generic(user_id, reactions):
+    # SQLite: INSERT ... ON CONFLICT DO NOTHING takes the write lock first, so
+    # reading and switching an existing row afterwards cannot race another writer.
+    table, user, post, value = _like_columns()
+    results = {}
+    with connection.cursor() as cursor:
+        for post_id, reaction in reactions.items():
+            cursor.execute(
+                f"INSERT INTO {table} ({user}, {post}, {value}) VALUES (%s, %s, %s) "
+                f"ON CONFLICT ({user}, {post}) DO NOTHING",
+                [user_id, post_id, reaction],
+            )
+            if cursor.rowcount == 1:
+                results[post_id] = (cursor.lastrowid, None)
+                continue
+            like_id, previous = Like.objects.filter(user_id=user_id, post_id=post_id).values_list('id', 'value').get()
+            if previous != reaction:
+                Like.objects.filter(id=like_id).update(value=reaction)
+            results[post_id] = (like_id, previous)
+    return results
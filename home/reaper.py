@@ -0,0 +1,33 @@
+import time
+from django.conf import settings
+from home.models import FeedEntry, Like, Post
+
+# Deleting a post with on_delete=CASCADE removes every reaction in the request
+# transaction, holding locks for as long as that takes. PostViewSet.destroy only
+# sets Post.deleted_at; the dependent rows are deleted here, BATCH_SIZE at a
+# time, each batch its own short transaction, with PAUSE seconds between batches
+# so other writers get the table back.
+
+
+def delete_batch(queryset, batch_size):
+    ids = list(queryset.order_by().values_list('id', flat=True)[:batch_size])
+    if ids:
+        queryset.model.objects.filter(id__in=ids).delete()
+    return len(ids)
+
+
+def reap_post(post_id, max_batches=None):
+    # Returns True once the post is gone, False when `max_batches` ran out first
+    config = settings.POST_REAPER
+    budget = max_batches or config['MAX_BATCHES']
+    for queryset in (Like.objects.filter(post=post_id), FeedEntry.objects.filter(post=post_id)):
+        while True:
+            if delete_batch(queryset, config['BATCH_SIZE']) < config['BATCH_SIZE']:
+                break
+            budget -= 1
+            if budget == 0:
+                return False
+            time.sleep(config['PAUSE'])
+    # nothing left to cascade to, this is a single row delete
+    Post.all_objects.filter(id=post_id).exclude(deleted_at=None).delete()
+    return True
@@ -0,0 +1,123 @@
+from django.conf import settings
+from django.db import connections, router
+from home.models import Post
+
+# Full-text index over Post.body.
+# Postgres: a GIN index on to_tsvector(body); the expression is recomputed by the
+# database on every write, so the index follows creates, updates and deletes.
+# SQLite: an FTS5 table with Post as external content, kept in sync by triggers.
+# Either way a search only visits matching rows. Other backends fall back to a
+# body__icontains scan.
+SEARCH_INDEX_NAME = 'post_body_search_idx'
+
+
+def search_backend(connection):
+    if connection.vendor == 'postgresql':
+        return 'postgresql'
+    if connection.vendor == 'sqlite':
+        return 'fts5'
+    return None
+
+
+def _names(connection):
+    quote = connection.ops.quote_name
+    table = Post._meta.db_table
+    return {
+        'table': quote(table),
+        'fts_table': quote(f"{table}_fts"),
+        'body': quote(Post._meta.get_field('body').column),
+        'deleted_at': quote(Post._meta.get_field('deleted_at').column),
+        'archived_at': quote(Post._meta.get_field('archived_at').column),
+        'insert_trigger': quote(f"{table}_fts_insert"),
+        'delete_trigger': quote(f"{table}_fts_delete"),
+        'update_trigger': quote(f"{table}_fts_update"),
+    }
+
+
+def ensure_search_index(using='default'):
+    # Idempotent, runs after every migrate (see HomeConfig.ready)
+    connection = connections[using]
+    backend = search_backend(connection)
+    names = _names(connection)
+    with connection.cursor() as cursor:
+        if backend == 'postgresql':
+            # Built CONCURRENTLY so posts stay writable while a large table is
+            # indexed (post_migrate runs outside a transaction; inside one, e.g.
+            # a test database, the plain build is used). A failed concurrent
+            # build leaves an invalid index behind, which is dropped and rebuilt.
+            cursor.execute(
+                "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+                [SEARCH_INDEX_NAME],
+            )
+            row = cursor.fetchone()
+            if row is not None and row[0]:
+                return
+            concurrently = '' if connection.in_atomic_block else 'CONCURRENTLY '
+            if row is not None:
+                cursor.execute("DROP INDEX {concurrently}IF EXISTS {index}".format(concurrently=concurrently, index=SEARCH_INDEX_NAME))
+            cursor.execute(
+                "CREATE INDEX {concurrently}IF NOT EXISTS {index} ON {table} USING gin (to_tsvector(%s::regconfig, {body}))".format(
+                    concurrently=concurrently, index=SEARCH_INDEX_NAME, **names),
+                [settings.POST_SEARCH['CONFIG']],
+            )
+        elif backend == 'fts5':
+            # SQLite drops the triggers when a migration rebuilds the post table,
+            # so they are checked on every run and the index rebuilt if one was missing
+            cursor.execute(
+                "SELECT count(*) FROM sqlite_master WHERE name IN (%s, %s, %s, %s)",
+                [name.strip('"') for name in (names['fts_table'], names['insert_trigger'], names['delete_trigger'], names['update_trigger'])],
+            )
+            if cursor.fetchone()[0] == 4:
+                return
+            statements = [
+                "CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5({body}, content={table}, content_rowid='id')",
+                "CREATE TRIGGER IF NOT EXISTS {insert_trigger} AFTER INSERT ON {table} BEGIN "
+                "INSERT INTO {fts_table}(rowid, {body}) VALUES (new.id, new.{body}); END",
+                "CREATE TRIGGER IF NOT EXISTS {delete_trigger} AFTER DELETE ON {table} BEGIN "
+                "INSERT INTO {fts_table}({fts_table}, rowid, {body}) VALUES ('delete', old.id, old.{body}); END",
+                "CREATE TRIGGER IF NOT EXISTS {update_trigger} AFTER UPDATE OF {body} ON {table} BEGIN "
+                "INSERT INTO {fts_table}({fts_table}, rowid, {body}) VALUES ('delete', old.id, old.{body}); "
+                "INSERT INTO {fts_table}(rowid, {body}) VALUES (new.id, new.{body}); END",
+                # index the posts written while the table or a trigger was missing
+                "INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')",
+            ]
+            for statement in statements:
+                cursor.execute(statement.format(**names))
+
+
+def fts5_query(text):
+    # every word as a quoted FTS5 string, so user input can't use query syntax
+    return ' '.join('"{}"'.format(word.replace('"', '""')) for word in text.split())
+
+
+def search_post_ids(text, limit, offset=0):
+    # Ids of posts matching `text`, best match first (ties: newest first)
+    connection = connections[router.db_for_read(Post)]
+    backend = search_backend(connection)
+    names = _names(connection)
+    if backend == 'postgresql':
+        config = settings.POST_SEARCH['CONFIG']
+        sql = (
+            "SELECT id FROM {table}, websearch_to_tsquery(%s::regconfig, %s) query "
+            "WHERE to_tsvector(%s::regconfig, {body}) @@ query AND {deleted_at} IS NULL AND {archived_at} IS NULL "
+            "ORDER BY ts_rank(to_tsvector(%s::regconfig, {body}), query) DESC, id DESC LIMIT %s OFFSET %s"
+        ).format(**names)
+        params = [config, text, config, config, limit, offset]
+    elif backend == 'fts5':
+        query = fts5_query(text)
+        if not query:
+            return []
+        # soft-deleted and archiving posts stay indexed until their rows are deleted
+        sql = (
+            "SELECT {fts_table}.rowid FROM {fts_table} JOIN {table} ON {table}.id = {fts_table}.rowid "
+            "WHERE {fts_table} MATCH %s AND {table}.{deleted_at} IS NULL AND {table}.{archived_at} IS NULL "
+            "ORDER BY {fts_table}.rank, {fts_table}.rowid DESC LIMIT %s OFFSET %s"
+        ).format(**names)
+        params = [query, limit, offset]
+    else:
+        queryset = Post.objects.filter(body__icontains=text).order_by('-id').values_list('id', flat=True)
+        return list(queryset[offset:offset + limit])
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
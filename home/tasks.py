@@ -0,0 +1,79 @@
+from django.conf import settings
+from home.email_verification import email_verifier
+from home.feed import backfill_feed, fan_out_posts
+from home.geolocation import geolocator
+from home.holiday_calendar import holiday_calendar
+from home.jobs import enqueue, register_task
+from home.models import MyUser
+from home.reaper import reap_post
+
+ENRICHMENT_FIELDS = ['latitude', 'longitude', 'country', 'country_code', 'holiday']
+
+
+def apply_signup_enrichment(results):
+    # one bulk UPDATE for the whole batch instead of one per user
+    users = []
+    for payload, enriched_data in results:
+        user = MyUser(id=payload['user_id'])
+        for field in ENRICHMENT_FIELDS:
+            setattr(user, field, enriched_data[field])
+        users.append(user)
+    MyUser.objects.bulk_update(users, ENRICHMENT_FIELDS, batch_size=settings.JOB_QUEUE['BATCH_SIZE'])
+    print(f"Enriched {len(users)} users with geolocation data")
+
+
+@register_task('enrich_signup', commit=apply_signup_enrichment)
+def perform_data_enrichment(payload):
+    ip = payload['ip']
+    location = geolocator.lookup(ip)
+    if location is None:
+        print(f"Can't fetch geolocation for user {payload['user_id']} having ip address {ip}")
+        return {'latitude': None, 'longitude': None, 'country': None, 'country_code': None, 'holiday': None}
+    return {
+        'latitude': location.latitude,
+        'longitude': location.longitude,
+        'country': location.country_name,
+        'country_code': location.country_code,
+        'holiday': holiday_calendar.is_holiday(location.country_code),
+    }
+
+
+def apply_email_verification(results):
+    # one UPDATE per verification state in the batch
+    users_by_state = {}
+    for payload, state in results:
+        users_by_state.setdefault(state, []).append(payload['user_id'])
+    for state, user_ids in users_by_state.items():
+        MyUser.objects.filter(id__in=user_ids).update(email_verification=state)
+
+
+@register_task('verify_email', commit=apply_email_verification)
+def perform_email_verification(payload):
+    return email_verifier.verify(payload['email'])
+
+
+def apply_fan_out(results):
+    fan_out_posts([payload['post_id'] for payload, _ in results])
+
+
+@register_task('fan_out_post', commit=apply_fan_out)
+def perform_fan_out(payload):
+    # all the work is database writes, done for the whole batch in apply_fan_out
+    return None
+
+
+def apply_feed_backfill(results):
+    for payload, _ in results:
+        backfill_feed(payload['user_id'], payload['author_id'])
+
+
+@register_task('backfill_feed', commit=apply_feed_backfill)
+def perform_feed_backfill(payload):
+    return None
+
+
+@register_task('reap_post')
+def perform_post_reap(payload):
+    # a post with more reactions than one run may delete continues in a new job
+    if not reap_post(payload['post_id']):
+        enqueue('reap_post', payload)
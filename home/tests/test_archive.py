@@ -0,0 +1,98 @@
+import io
+from datetime import timedelta
+from unittest import mock
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from home import archive
+from home.cache import post_cache
+from home.models import *
+from rest_framework import status
+
+ARCHIVE = {'AFTER_DAYS': 30, 'BATCH_SIZE': 2, 'ROW_BATCH_SIZE': 2, 'PAUSE': 0}
+
+
+class ArchiveTestCases(APITestCase):
+
+    def setUp(self):
+        post_cache.clear()
+        self.user = MyUser.objects.create_user(username="dummy_one", password="Dummy1__")
+        self.reader = MyUser.objects.create_user(username="dummy_two", password="Dummy1__")
+        self.posts = [Post.objects.create(author=self.user, body=f"Post {i}", active=True) for i in range(5)]
+        for post in self.posts:
+            Like.objects.create(user=self.reader, post=post, value='Like')
+            FeedEntry.objects.create(user=self.reader, post=post, author=self.user, created_at=post.created_at)
+        # the first three are old enough to archive
+        for days, post in zip([90, 60, 45], self.posts):
+            old = timezone.now() - timedelta(days=days)
+            Post.objects.filter(id=post.id).update(created_at=old, updated_at=old, like_count=1)
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + str(token))
+
+    def archive(self, *args):
+        with self.settings(ARCHIVE=ARCHIVE):
+            call_command('archive_posts', *args, stdout=io.StringIO())
+
+    def test_moves_old_posts_with_their_likes(self):
+        self.archive()
+        old_ids = [post.id for post in self.posts[:3]]
+        self.assertEqual(sorted(ArchivedPost.objects.values_list('id', flat=True)), old_ids)
+        self.assertEqual(sorted(ArchivedLike.objects.values_list('post_id', flat=True)), old_ids)
+        self.assertFalse(Post.objects.filter(id__in=old_ids).exists())
+        self.assertFalse(Like.objects.filter(post__in=old_ids).exists())
+        self.assertFalse(FeedEntry.objects.filter(post__in=old_ids).exists())
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(ArchivedPost.objects.get(id=old_ids[0]).body, "Post 0")
+
+    def test_retrieve_reads_the_archive(self):
+        url = f'/api/v1/posts/{self.posts[0].id}/'
+        before = self.client.get(url).data
+        post_cache.clear()
+        self.archive()
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, before)
+        res = self.client.get(f'/api/v1/post-reactions/{self.posts[0].id}')
+        self.assertEqual(res.data['num_of_likes'], 1)
+        ids = [post['id'] for post in self.client.get('/api/v1/posts/').data['results']]
+        self.assertEqual(sorted(ids), [post.id for post in self.posts[3:]])
+
+    def test_resumes_oldest_first(self):
+        self.archive('--max-batches=1')
+        self.assertEqual(sorted(ArchivedPost.objects.values_list('id', flat=True)), [self.posts[0].id, self.posts[1].id])
+        self.archive()
+        self.assertEqual(ArchivedPost.objects.count(), 3)
+        self.archive('--days=0')
+        self.assertEqual(Post.objects.count(), 0)
+        self.assertEqual(ArchivedLike.objects.count(), 5)
+
+    def test_likes_move_in_row_bounded_batches(self):
+        for i in range(4):
+            liker = MyUser.objects.create_user(username=f"liker_{i}", password="Dummy1__")
+            Like.objects.create(user=liker, post=self.posts[0], value='Like')
+        with mock.patch('home.archive.copy_rows', wraps=archive.copy_rows) as copy_rows:
+            self.archive('--max-batches=1')
+        sizes = [len(call[0][4]) for call in copy_rows.call_args_list if call[0][2] is ArchivedLike]
+        self.assertEqual(sizes, [2, 2, 2])
+        self.assertEqual(ArchivedLike.objects.filter(post=self.posts[0].id).count(), 5)
+
+    def test_stopped_run_is_finished_with_late_likes(self):
+        with self.settings(ARCHIVE=ARCHIVE):
+            marked = archive.mark_batch(archive.archive_cutoff(), 2)
+        self.assertEqual(marked, [self.posts[0].id, self.posts[1].id])
+        # hidden from the live queries, still readable from the archive
+        self.assertFalse(Post.objects.filter(id=self.posts[0].id).exists())
+        res = self.client.get(f'/api/v1/posts/{self.posts[0].id}/')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['body'], "Post 0")
+        res = self.client.post('/api/v1/likes/', {'post': self.posts[0].id, 'value': 'Like'}, format='json')
+        self.assertNotIn(res.status_code, [status.HTTP_200_OK, status.HTTP_201_CREATED])
+        # a like committed by a request that read the post before it was marked
+        Like.objects.create(user=self.user, post=self.posts[0], value='Unlike')
+        self.archive()
+        self.assertEqual(Post.all_objects.filter(id__in=marked).count(), 0)
+        self.assertEqual(ArchivedLike.objects.filter(post=self.posts[0].id).count(), 2)
+        counts = ArchivedPost.objects.values_list('like_count', 'unlike_count').get(id=self.posts[0].id)
+        self.assertEqual(counts, (1, 1))
+        self.assertEqual(ArchivedPost.objects.count(), 3)
@@ -0,0 +1,48 @@
+from datetime import timedelta
+from unittest import mock
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+from home.api.v1.authentication import token_cache
+from home.cache import post_cache
+from home.models import *
+from rest_framework import status
+
+
+class CachedJWTAuthenticationTestCases(APITestCase):
+    posts_url = '/api/v1/posts/'
+
+    def setUp(self):
+        token_cache.clear()
+        post_cache.clear()
+        self.user = MyUser.objects.create_user(username="dummy_one", password="Dummy1__")
+        self.token = AccessToken.for_user(self.user)
+
+    def authenticate(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + str(token))
+
+    def test_token_is_verified_once(self):
+        self.authenticate(self.token)
+        verify = JWTAuthentication.get_validated_token
+        with mock.patch.object(JWTAuthentication, 'get_validated_token', autospec=True, side_effect=verify) as validate:
+            self.client.get(self.posts_url)
+            self.client.get(self.posts_url)
+        self.assertEqual(validate.call_count, 1)
+
+    def test_post_author_comes_from_verified_token(self):
+        self.authenticate(self.token)
+        res = self.client.post(self.posts_url, {'body': "Post", 'active': True, 'author': 12345}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['author'], self.user.id)
+
+    def test_tampered_token_is_rejected(self):
+        self.authenticate(str(self.token)[:-2] + "xx")
+        res = self.client.get(self.posts_url)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_expired_token_is_rejected(self):
+        self.token.set_exp(lifetime=-timedelta(seconds=1))
+        self.authenticate(self.token)
+        res = self.client.get(self.posts_url)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(token_cache.size(), 0)
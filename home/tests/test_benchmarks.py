@@ -0,0 +1,42 @@
+import random
+from django.test import TestCase
+from home.benchmarks import BenchmarkContext, compare_with_baseline, percentile, private_caches, run_benchmarks, seed
+from home.cache import post_cache
+import home.api.v1.viewsets as viewsets
+from home.models import *
+
+
+class BenchmarkTestCases(TestCase):
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 95), 7)
+
+    def test_regressions(self):
+        baseline = {'posts_list': {'p95_ms': 10.0, 'queries_max': 3, 'errors': 0}}
+        self.assertEqual(compare_with_baseline({'posts_list': {'p95_ms': 11.0, 'queries_max': 3, 'errors': 0}}, baseline, 0.25), [])
+        regressions = compare_with_baseline({'posts_list': {'p95_ms': 13.0, 'queries_max': 4, 'errors': 0}}, baseline, 0.25)
+        self.assertEqual(len(regressions), 2)
+
+    def test_every_scenario_succeeds(self):
+        rng = random.Random(0)
+        users, post_ids = seed(3, 2, 2, rng)
+        self.assertEqual(Post.objects.count(), 6)
+        self.assertEqual(Like.objects.count(), 6)
+        self.assertEqual(sum(Post.objects.values_list('like_count', flat=True)) + sum(Post.objects.values_list('unlike_count', flat=True)), 6)
+        results = run_benchmarks(BenchmarkContext(users[0], post_ids, rng), requests=2)
+        self.assertEqual({name: result['errors'] for name, result in results.items() if result['errors']}, {})
+
+    def test_private_caches_leave_the_configured_ones_alone(self):
+        post_cache.set(1, {'id': 1})
+        backend, trending = post_cache.backend, viewsets.trending
+        with private_caches():
+            self.assertIsNot(post_cache.backend, backend)
+            self.assertIsNot(viewsets.trending, trending)
+            post_cache.clear()
+        self.assertIs(post_cache.backend, backend)
+        self.assertIs(viewsets.trending, trending)
+        self.assertEqual(post_cache.get_many([1]), [{'id': 1}])
+        post_cache.clear()
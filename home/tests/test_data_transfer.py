@@ -0,0 +1,122 @@
+import io
+import json
+import os
+import tempfile
+from datetime import timedelta
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from home.data_transfer import EXPORT_STATE, IMPORT_STATE
+from home.models import *
+
+
+class DataTransferTestCases(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.author = MyUser.objects.create_user(username="dummy_one", password="Dummy1__", country=None)
+        self.reader = MyUser.objects.create_user(username="dummy_two", password="Dummy1__", country="Pakistan")
+        self.posts = [Post.objects.create(body=f"Post {i}, \"quoted\"\nline", author=self.author, active=bool(i % 2)) for i in range(5)]
+        old = timezone.now() - timedelta(days=30)
+        Post.objects.filter(id=self.posts[0].id).update(created_at=old, updated_at=old)
+        for post in self.posts:
+            Like.objects.create(user=self.reader, post=post, value='Like' if post.id % 2 else 'Unlike')
+
+    def tearDown(self):
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+        os.rmdir(self.directory)
+
+    def snapshot(self):
+        return [
+            list(MyUser.objects.order_by('id').values('id', 'username', 'password', 'country', 'date_joined')),
+            list(Post.objects.order_by('id').values()),
+            list(Like.objects.order_by('id').values()),
+        ]
+
+    def round_trip(self, fmt):
+        before = self.snapshot()
+        call_command('export_data', self.directory, f'--format={fmt}', '--batch-size=2', stdout=io.StringIO())
+        MyUser.objects.all().delete()
+        out = io.StringIO()
+        call_command('import_data', self.directory, f'--format={fmt}', '--batch-size=2', stdout=out)
+        self.assertEqual(self.snapshot(), before)
+        self.assertIn("posts: done, 5 rows", out.getvalue())
+
+    def test_ndjson_round_trip(self):
+        self.round_trip('ndjson')
+
+    def test_csv_round_trip(self):
+        self.round_trip('csv')
+
+    def test_archived_rows_round_trip(self):
+        call_command('archive_posts', '--days=7', stdout=io.StringIO())
+        self.assertEqual(ArchivedPost.objects.count(), 1)
+        archived = [list(ArchivedPost.objects.values()), list(ArchivedLike.objects.values())]
+        call_command('export_data', self.directory, f'--since={(timezone.now() - timedelta(days=31)).date().isoformat()}', stdout=io.StringIO())
+        MyUser.objects.all().delete()
+        call_command('import_data', self.directory, stdout=io.StringIO())
+        self.assertEqual([list(ArchivedPost.objects.values()), list(ArchivedLike.objects.values())], archived)
+        self.assertEqual(Post.objects.count(), 4)
+        connection.check_constraints()
+
+    def test_refuses_non_empty_tables(self):
+        call_command('export_data', self.directory, stdout=io.StringIO())
+        Post.objects.all().delete()
+        Like.objects.all().delete()
+        with self.assertRaisesMessage(CommandError, "non-empty tables: users"):
+            call_command('import_data', self.directory, stdout=io.StringIO())
+        self.assertFalse(Post.objects.exists())
+        # posts and likes alone may go on top of the users already there
+        call_command('import_data', self.directory, '--tables', 'posts', 'likes', stdout=io.StringIO())
+        self.assertEqual(Post.objects.count(), 5)
+
+    def test_time_range(self):
+        since = (timezone.now() - timedelta(days=1)).date().isoformat()
+        call_command('export_data', self.directory, '--tables', 'posts', 'likes', f'--since={since}', stdout=io.StringIO())
+        with open(os.path.join(self.directory, 'posts.ndjson')) as posts_file:
+            ids = [json.loads(line)['id'] for line in posts_file]
+        self.assertEqual(ids, [post.id for post in self.posts[1:]])
+        with open(os.path.join(self.directory, 'likes.ndjson')) as likes_file:
+            self.assertEqual(len(likes_file.readlines()), 4)
+
+    def test_time_range_export_loads_into_empty_database(self):
+        # the author joined long before the exported posts
+        MyUser.objects.filter(id=self.author.id).update(date_joined=timezone.now() - timedelta(days=365))
+        outsider = MyUser.objects.create_user(username="outsider", password="Dummy1__")
+        MyUser.objects.filter(id=outsider.id).update(date_joined=timezone.now() - timedelta(days=365))
+        since = (timezone.now() - timedelta(days=1)).date().isoformat()
+        call_command('export_data', self.directory, f'--since={since}', stdout=io.StringIO())
+        MyUser.objects.all().delete()
+        call_command('import_data', self.directory, stdout=io.StringIO())
+        self.assertEqual(sorted(MyUser.objects.values_list('username', flat=True)), ["dummy_one", "dummy_two"])
+        self.assertEqual(sorted(Post.objects.values_list('id', flat=True)), [post.id for post in self.posts[1:]])
+        self.assertEqual(Like.objects.count(), 4)
+        connection.check_constraints()
+
+    def test_resume_export(self):
+        call_command('export_data', self.directory, '--tables=posts', '--batch-size=2', stdout=io.StringIO())
+        with open(os.path.join(self.directory, 'posts.ndjson')) as posts_file:
+            lines = posts_file.readlines()
+        # interrupted after the first chunk, halfway through writing the second
+        with open(os.path.join(self.directory, EXPORT_STATE)) as state_file:
+            state = json.load(state_file)
+        state['tables']['posts'] = {'last_id': self.posts[1].id, 'offset': len(''.join(lines[:2]).encode()), 'rows': 2}
+        with open(os.path.join(self.directory, EXPORT_STATE), 'w') as state_file:
+            json.dump(state, state_file)
+        with open(os.path.join(self.directory, 'posts.ndjson'), 'a') as posts_file:
+            posts_file.write(lines[2][:10])
+        call_command('export_data', self.directory, '--tables=posts', '--batch-size=2', '--resume', stdout=io.StringIO())
+        with open(os.path.join(self.directory, 'posts.ndjson')) as posts_file:
+            self.assertEqual(posts_file.readlines(), lines)
+
+    def test_resume_import(self):
+        call_command('export_data', self.directory, stdout=io.StringIO())
+        before = self.snapshot()
+        Post.objects.filter(id__gt=self.posts[1].id).delete()
+        # users and the first two posts made it in before the interruption
+        with open(os.path.join(self.directory, IMPORT_STATE), 'w') as state_file:
+            json.dump({'format': 'ndjson', 'tables': {'users': 2, 'posts': 2}}, state_file)
+        call_command('import_data', self.directory, '--resume', stdout=io.StringIO())
+        self.assertEqual(self.snapshot(), before)
@@ -0,0 +1,86 @@
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.core.management import call_command
+from django.db import connections
+from django.test import override_settings
+from home.api.v1.authentication import token_cache
+from home.cache import post_cache
+from home.db_router import ReplicaRouter, pins, replica_health
+from home.models import *
+from rest_framework import status
+
+# A second in-memory SQLite database standing in for a replica, registered only
+# for this test case and migrated by it; replication is simulated by writing
+# rows to both databases.
+REPLICA = 'replica_test'
+
+
+class ReplicaRouterTestCases(APITestCase):
+    databases = {'default', REPLICA}
+
+    @classmethod
+    def setUpClass(cls):
+        connections.databases[REPLICA] = dict(connections.databases['default'], NAME=':memory:', TEST={})
+        call_command('migrate', database=REPLICA, run_syncdb=True, verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.databases[REPLICA]
+
+    def setUp(self):
+        post_cache.clear()
+        token_cache.clear()
+        pins.clear()
+        replica_health.reset()
+        self.user = MyUser.objects.create_user(username="dummy_one", password="Dummy1__")
+        MyUser.objects.using(REPLICA).create(id=self.user.id, username="dummy_one", password=self.user.password)
+        self.post = Post.objects.create(author=self.user, body="On the primary", active=True)
+        # the replica lags behind: it still has the old body
+        Post.objects.using(REPLICA).create(id=self.post.id, author_id=self.user.id, body="On the replica", active=True)
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + str(token))
+
+    def body(self):
+        # sparse payloads are read straight from the routed database
+        res = self.client.get('/api/v1/posts/', {'fields': 'body'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data['results'][0]['body']
+
+    @override_settings(DATABASE_REPLICAS=[REPLICA])
+    def test_safe_requests_read_from_replica(self):
+        self.assertEqual(self.body(), "On the replica")
+
+    def test_without_replicas_everything_uses_primary(self):
+        self.assertEqual(self.body(), "On the primary")
+
+    @override_settings(DATABASE_REPLICAS=[REPLICA])
+    def test_reads_stick_to_primary_after_a_write(self):
+        res = self.client.post('/api/v1/likes/', {'post': self.post.id, 'value': 'Like'}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.body(), "On the primary")
+        pins.clear()
+        self.assertEqual(self.body(), "On the replica")
+
+    @override_settings(DATABASE_REPLICAS=[REPLICA])
+    def test_post_cache_is_filled_from_primary(self):
+        # a lagging replica must not put a stale payload in the shared cache
+        res = self.client.get(f'/api/v1/posts/{self.post.id}/')
+        self.assertEqual(res.data['body'], "On the primary")
+        self.assertEqual(self.body(), "On the replica")
+
+    @override_settings(DATABASE_REPLICAS=[REPLICA])
+    def test_unhealthy_replica_is_skipped(self):
+        replica_health._checked[REPLICA] = (float('inf'), False)
+        self.assertEqual(self.body(), "On the primary")
+
+    @override_settings(DATABASE_REPLICAS=[REPLICA])
+    def test_writes_and_migrations_stay_on_primary(self):
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_write(Post), 'default')
+        self.assertEqual(router.db_for_read(Post), 'default')
+        self.assertFalse(router.allow_migrate(REPLICA, 'home'))
+        self.assertTrue(router.allow_migrate('default', 'home'))
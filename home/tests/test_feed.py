@@ -0,0 +1,78 @@
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.test import override_settings
+from home.cache import post_cache
+from home.jobs import Worker
+from home.models import *
+from rest_framework import status
+import home.tasks  # noqa: F401
+
+
+class FeedTestCases(APITestCase):
+    feed_url = '/api/v1/feed/'
+
+    def setUp(self):
+        post_cache.clear()
+        self.reader = MyUser.objects.create_user(username="reader", password="Dummy1__")
+        self.authors = [MyUser.objects.create_user(username=f"author_{i}", password="Dummy1__") for i in range(2)]
+        self.stranger = MyUser.objects.create_user(username="stranger", password="Dummy1__")
+        self.worker = Worker(concurrency=1, batch_size=100)
+
+    def tearDown(self):
+        self.worker.pool.shutdown()
+
+    def login(self, user):
+        token = RefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + str(token))
+
+    def follow(self, author):
+        self.login(self.reader)
+        res = self.client.post('/api/v1/follows/', {'followee': author.id}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        return res.data['id']
+
+    def publish(self, author, body):
+        self.login(author)
+        return self.client.post('/api/v1/posts/', {'body': body, 'active': True}, format='json').data['id']
+
+    def feed(self):
+        self.login(self.reader)
+        ids, url = [], self.feed_url + '?page_size=2'
+        while url:
+            res = self.client.get(url)
+            ids += [post['id'] for post in res.data['results']]
+            url = res.data['next']
+        return ids
+
+    def test_feed_holds_followed_authors_posts(self):
+        old_post = self.publish(self.authors[0], "Before follow")
+        for author in self.authors:
+            self.follow(author)
+        posts = [self.publish(author, f"Post {i}") for i, author in enumerate(self.authors * 2)]
+        self.publish(self.stranger, "Not followed")
+        while self.worker.run_batch():
+            pass
+        self.assertEqual(self.feed(), sorted(posts + [old_post], reverse=True))
+
+    def test_unfollow_removes_author_from_feed(self):
+        follow_id = self.follow(self.authors[0])
+        self.publish(self.authors[0], "Post")
+        self.worker.run_batch()
+        self.login(self.reader)
+        self.client.delete(f'/api/v1/follows/{follow_id}/')
+        self.assertEqual(self.feed(), [])
+
+    def test_following_twice_returns_the_existing_follow(self):
+        follow_id = self.follow(self.authors[0])
+        res = self.client.post('/api/v1/follows/', {'followee': self.authors[0].id}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['id'], follow_id)
+        self.assertEqual(Follow.objects.filter(follower=self.reader).count(), 1)
+        self.assertEqual(Job.objects.filter(task='backfill_feed').count(), 1)
+
+    @override_settings(FEED={'MAX_ENTRIES': 3, 'FAN_OUT_CHUNK': 2})
+    def test_feed_is_capped(self):
+        self.follow(self.authors[0])
+        posts = [self.publish(self.authors[0], f"Post {i}") for i in range(5)]
+        self.worker.run_batch()
+        self.assertEqual(self.feed(), sorted(posts, reverse=True)[:3])
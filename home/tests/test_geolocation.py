@@ -0,0 +1,55 @@
+import os
+import tempfile
+from unittest import mock
+from django.test import SimpleTestCase
+from home.geolocation import GeoIndex, Geolocator
+
+RANGES = """# network,country_code,latitude,longitude,country_name
+39.110.0.0/16,JP,35.69,139.69,Japan
+8.8.8.0/24,US,37.751,-97.822,United States
+2400:cb00::/32,AU,-33.86,151.2,Australia
+"""
+
+
+class GeolocationTestCases(SimpleTestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(handle, 'w') as csv_file:
+            csv_file.write(RANGES)
+        self.config = {
+            'DATABASE': self.path, 'CACHE_SIZE': 10, 'CACHE_TTL': 60,
+            'REMOTE_FALLBACK': False, 'REMOTE_URL': "http://geo/{ip}", 'REMOTE_TIMEOUT': 1,
+        }
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_index_lookup(self):
+        index = GeoIndex.from_csv(self.path)
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.lookup('39.110.142.79'), ('JP', 'Japan', 35.69, 139.69))
+        self.assertEqual(index.lookup('8.8.8.255').country_code, 'US')
+        self.assertEqual(index.lookup('2400:cb00::1').country_name, 'Australia')
+        self.assertIsNone(index.lookup('8.8.9.1'))
+        self.assertIsNone(index.lookup('1.1.1.1'))
+
+    def test_private_addresses_are_skipped(self):
+        self.assertIsNone(Geolocator(self.config).lookup('127.0.0.1'))
+        self.assertIsNone(Geolocator(self.config).lookup('not an ip'))
+
+    def test_lookups_are_cached(self):
+        geolocator = Geolocator(self.config)
+        with mock.patch.object(GeoIndex, 'lookup', wraps=geolocator.index.lookup) as lookup:
+            geolocator.lookup('39.110.142.79')
+            geolocator.lookup('39.110.142.79')
+            geolocator.lookup('1.1.1.1')
+            geolocator.lookup('1.1.1.1')
+        self.assertEqual(lookup.call_count, 2)
+
+    def test_remote_fallback_only_when_enabled(self):
+        geolocator = Geolocator({**self.config, 'REMOTE_FALLBACK': True})
+        with mock.patch.object(Geolocator, 'remote_lookup', return_value=None) as remote_lookup:
+            geolocator.lookup('1.1.1.1')
+            geolocator.lookup('39.110.142.79')
+        remote_lookup.assert_called_once_with('1.1.1.1')
@@ -0,0 +1,37 @@
+import io
+from datetime import date
+from django.core.management import call_command
+from django.test import TestCase
+from home.holiday_calendar import HolidayCalendar
+from home.models import *
+
+
+class HolidayCalendarTestCases(TestCase):
+
+    def test_holidays_are_memoized_per_country_and_year(self):
+        calendar = HolidayCalendar()
+        self.assertTrue(calendar.is_holiday('pk', date(2026, 8, 14)))
+        self.assertFalse(calendar.is_holiday('PK', date(2026, 8, 13)))
+        self.assertIs(calendar.holidays_for('PK', 2026), calendar.holidays_for('pk', 2026))
+
+    def test_unsupported_country(self):
+        self.assertIsNone(HolidayCalendar().is_holiday('XX', date(2026, 1, 1)))
+        self.assertIsNone(HolidayCalendar().is_holiday(None))
+
+    def test_refresh_holidays_updates_users_by_country(self):
+        for i, code in enumerate(['PK', 'PK', 'US', 'XX', None]):
+            MyUser.objects.create_user(username=f"dummy_{i}", password="Dummy1__", country_code=code)
+        with self.assertNumQueries(7):
+            # names to backfill, distinct countries, savepoint, one UPDATE per holiday value, release
+            call_command('refresh_holidays', '--date=2026-08-14', stdout=io.StringIO())
+        self.assertEqual(MyUser.objects.filter(holiday='True').count(), 2)
+        self.assertEqual(MyUser.objects.filter(holiday='False').count(), 1)
+
+    def test_refresh_holidays_backfills_country_codes(self):
+        for i, country in enumerate(['Pakistan', 'United States', 'Atlantis', None]):
+            MyUser.objects.create_user(username=f"dummy_{i}", password="Dummy1__", country=country)
+        call_command('refresh_holidays', '--date=2026-08-14', stdout=io.StringIO())
+        self.assertEqual(
+            list(MyUser.objects.order_by('username').values_list('country_code', 'holiday')),
+            [('PK', 'True'), ('US', 'False'), (None, None), (None, None)],
+        )
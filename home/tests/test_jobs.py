@@ -0,0 +1,90 @@
+from datetime import timedelta
+from unittest import mock
+from django.conf import settings
+from django.test import TestCase
+from django.utils import timezone
+from home.models import *
+from home.jobs import TASKS, Worker, enqueue, register_task, backoff_delay
+from home.geolocation import GeoLocation
+import home.tasks  # noqa: F401
+
+
+class JobQueueTestCases(TestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.commits = []
+
+        def commit(results):
+            self.commits.append(results)
+
+        @register_task('test_task', commit=commit)
+        def perform(payload):
+            self.calls.append(payload)
+            if payload.get('fail'):
+                raise ValueError("boom")
+            return payload['n'] * 2
+
+        self.worker = Worker(concurrency=2, batch_size=10)
+
+    def tearDown(self):
+        TASKS.pop('test_task', None)
+        self.worker.pool.shutdown()
+
+    def test_successful_jobs_are_committed_in_one_batch(self):
+        for n in range(3):
+            enqueue('test_task', {'n': n})
+        self.assertEqual(self.worker.run_batch(), 3)
+        self.assertEqual(len(self.commits), 1)
+        self.assertEqual(sorted(result for _, result in self.commits[0]), [0, 2, 4])
+        self.assertEqual(Job.objects.filter(status=JOB_DONE).count(), 3)
+
+    def test_failed_job_is_retried_with_backoff(self):
+        job = enqueue('test_task', {'n': 1, 'fail': True}, max_attempts=2)
+        self.worker.run_batch()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (JOB_PENDING, 1))
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn("boom", job.last_error)
+        # not due yet
+        self.assertEqual(self.worker.run_batch(), 0)
+        Job.objects.filter(id=job.id).update(run_at=timezone.now())
+        self.worker.run_batch()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (JOB_FAILED, 2))
+
+    def test_expired_lease_counts_as_an_attempt(self):
+        job = enqueue('test_task', {'n': 1}, max_attempts=2)
+        stale = timezone.now() - timedelta(seconds=settings.JOB_QUEUE['LEASE_TIMEOUT'] + 1)
+        Job.objects.filter(id=job.id).update(status=JOB_RUNNING, locked_at=stale)
+        self.assertEqual(self.worker.run_batch(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (JOB_DONE, 1))
+        # the worker died again with the job, and it has no attempt left
+        Job.objects.filter(id=job.id).update(status=JOB_RUNNING, locked_at=stale)
+        self.assertEqual(self.worker.run_batch(), 0)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (JOB_FAILED, 2))
+        self.assertIn("Lease expired", job.last_error)
+
+    @mock.patch('home.jobs.close_old_connections')
+    def test_connections_are_checked_around_every_job(self, close_old_connections):
+        for n in range(3):
+            enqueue('test_task', {'n': n})
+        self.worker.run_batch()
+        self.assertEqual(close_old_connections.call_count, 6)
+
+    def test_backoff_grows_and_is_capped(self):
+        with self.settings(JOB_QUEUE={**settings.JOB_QUEUE, 'BACKOFF_BASE': 1, 'BACKOFF_MAX': 30}):
+            self.assertLessEqual(backoff_delay(1), 2)
+            self.assertGreaterEqual(backoff_delay(4), 8)
+            self.assertLessEqual(backoff_delay(20), 30)
+
+    @mock.patch('home.tasks.geolocator.lookup')
+    def test_signup_enrichment_updates_users_in_bulk(self, lookup):
+        lookup.return_value = GeoLocation('PK', 'Pakistan', 30.0, 70.0)
+        users = [MyUser.objects.create_user(username=f"dummy_{i}", password="Dummy1__") for i in range(3)]
+        for user in users:
+            enqueue('enrich_signup', {'user_id': user.id, 'ip': '39.110.142.79'})
+        self.worker.run_batch()
+        self.assertEqual(MyUser.objects.filter(country='Pakistan', latitude=30.0).count(), 3)
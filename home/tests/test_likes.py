@@ -0,0 +1,195 @@
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from home.models import *
+from home.cache import post_cache
+from home.reactions import upsert_reactions
+from rest_framework import status
+import io
+import random
+import threading
+import time
+
+
+class ReactionCounterTestCases(APITestCase):
+    likes_url = '/api/v1/likes/'
+
+    def setUp(self):
+        post_cache.clear()
+        self.user_one = MyUser.objects.create_user(username="dummy_one", password="Dummy1__")
+        self.user_two = MyUser.objects.create_user(username="dummy_two", password="Dummy2__")
+        self.post = Post.objects.create(author=self.user_one, body="Post", active=True)
+        self.login(self.user_one)
+
+    def login(self, user):
+        token = RefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + str(token))
+
+    def react(self, value):
+        res = self.client.post(self.likes_url, {'post': self.post.id, 'value': value}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        return res
+
+    def reactions(self):
+        res = self.client.get(reverse('reaction-count', kwargs={'post_id': self.post.id}))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data['num_of_likes'], res.data['num_of_unlikes']
+
+    def test_counters_follow_reaction_switches(self):
+        self.react('Like')
+        self.assertEqual(self.reactions(), (1, 0))
+        self.react('Like')
+        self.assertEqual(self.reactions(), (1, 0))
+        self.react('Unlike')
+        self.assertEqual(self.reactions(), (0, 1))
+        self.login(self.user_two)
+        self.react('Like')
+        self.assertEqual(self.reactions(), (1, 1))
+
+    def test_update_switches_the_reaction_and_the_counters(self):
+        like_id = self.react('Like').data['id']
+        url = f'{self.likes_url}{like_id}/'
+        res = self.client.put(url, {'post': self.post.id, 'value': 'Unlike'}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['value'], 'Unlike')
+        self.assertEqual(self.reactions(), (0, 1))
+        other = Post.objects.create(author=self.user_one, body="Other", active=True)
+        res = self.client.put(url, {'post': other.id, 'value': 'Like'}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.login(self.user_two)
+        res = self.client.put(url, {'post': self.post.id, 'value': 'Like'}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.reactions(), (0, 1))
+
+    def test_update_onto_a_reacted_post_is_rejected(self):
+        like_id = self.react('Like').data['id']
+        other = Post.objects.create(author=self.user_one, body="Other", active=True)
+        Like.objects.create(user=self.user_one, post=other, value='Like')
+        res = self.client.put(f'{self.likes_url}{like_id}/', {'post': other.id, 'value': 'Unlike'}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Like.objects.get(id=like_id).post_id, self.post.id)
+
+    def test_reactions_need_no_aggregate_queries(self):
+        self.react('Like')
+        with self.assertNumQueries(2):
+            # user lookup for authentication + the post row
+            self.reactions()
+
+    def test_rebuild_reaction_counts(self):
+        Like.objects.create(user=self.user_one, post=self.post, value='Like')
+        Like.objects.create(user=self.user_two, post=self.post, value='Unlike')
+        call_command('rebuild_reaction_counts', stdout=io.StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.like_count, self.post.unlike_count), (1, 1))
+        # counters already right: the post is not marked as modified
+        out = io.StringIO()
+        call_command('rebuild_reaction_counts', stdout=out)
+        self.assertEqual(Post.objects.get(id=self.post.id).updated_at, self.post.updated_at)
+        self.assertIn("for 0 of 1 posts", out.getvalue())
+
+
+class LikeBulkCreateTestCases(APITestCase):
+    bulk_url = '/api/v1/likes/bulk/'
+
+    def setUp(self):
+        post_cache.clear()
+        self.user = MyUser.objects.create_user(username="dummy_one", password="Dummy1__")
+        self.posts = [Post.objects.create(author=self.user, body=f"Post {i}", active=True) for i in range(3)]
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + str(token))
+
+    def test_bulk_reactions_replace_previous_ones(self):
+        Like.objects.create(user=self.user, post=self.posts[0], value='Unlike')
+        Post.objects.filter(id=self.posts[0].id).update(unlike_count=1)
+        items = [
+            {'post': self.posts[0].id, 'value': 'Like'},
+            {'post': self.posts[1].id, 'value': 'Like'},
+            {'post': self.posts[1].id, 'value': 'Unlike'},
+            {'post': self.posts[2].id},
+        ]
+        res = self.client.post(self.bulk_url, items, format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([like['value'] for like in res.data['results']], ['Like', 'Unlike', 'Unlike', 'Like'])
+        self.assertEqual(Like.objects.filter(user=self.user).count(), 3)
+        counts = {post.id: (post.like_count, post.unlike_count) for post in Post.objects.all()}
+        self.assertEqual(counts, {self.posts[0].id: (1, 0), self.posts[1].id: (0, 1), self.posts[2].id: (1, 0)})
+
+    def test_bulk_reactions_on_missing_post(self):
+        res = self.client.post(self.bulk_url, [{'post': self.posts[0].id}, {'post': 999}], format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data['errors'][0], {})
+        self.assertFalse(Like.objects.exists())
+
+
+class ReactionUpsertTestCases(TransactionTestCase):
+
+    def setUp(self):
+        post_cache.clear()
+        self.users = [MyUser.objects.create_user(username=f"dummy_{i}", password="Dummy1__") for i in range(4)]
+        self.posts = [Post.objects.create(author=self.users[0], body=f"Post {i}", active=True) for i in range(2)]
+
+    def test_upsert_reports_previous_value(self):
+        user, post = self.users[0].id, self.posts[0].id
+        like_id, previous = upsert_reactions(user, {post: 'Like'})[post]
+        self.assertIsNone(previous)
+        self.assertEqual(upsert_reactions(user, {post: 'Like'})[post], (like_id, 'Like'))
+        self.assertEqual(upsert_reactions(user, {post: 'Unlike'})[post], (like_id, 'Like'))
+        self.assertEqual(Like.objects.get().value, 'Unlike')
+
+    def test_concurrent_reactions_keep_one_row_and_exact_counters(self):
+        errors = []
+
+        def tap(user_id):
+            try:
+                for _ in range(25):
+                    post_id = random.choice(self.posts).id
+                    value = random.choice(LIKE_CHOICES_LIST)
+                    while True:
+                        try:
+                            upsert_reactions(user_id, {post_id: value})
+                            break
+                        except OperationalError:
+                            # SQLite reports lock contention instead of waiting
+                            time.sleep(0.001)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=tap, args=[user.id]) for user in self.users for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        for post in Post.objects.all():
+            likes = Like.objects.filter(post=post)
+            self.assertEqual(likes.count(), likes.values('user').distinct().count())
+            self.assertEqual(post.like_count, likes.filter(value='Like').count())
+            self.assertEqual(post.unlike_count, likes.filter(value='Unlike').count())
+
+    def test_dedupe_reactions_keeps_latest(self):
+        user, post = self.users[0], self.posts[0]
+        # rows as the old (user, post, value) constraint allowed them
+        with connection.schema_editor() as editor:
+            editor.alter_unique_together(Like, [['user', 'post']], [])
+        try:
+            Like.objects.create(user=user, post=post, value='Like')
+            Like.objects.create(user=user, post=post, value='Unlike')
+            out = io.StringIO()
+            with CaptureQueriesContext(connection) as queries:
+                call_command('dedupe_reactions', stdout=out)
+            # runs before migrate, so it must not touch columns migrate adds to posts
+            self.assertFalse(any('home_post' in query['sql'] for query in queries.captured_queries))
+        finally:
+            with connection.schema_editor() as editor:
+                editor.alter_unique_together(Like, [], [['user', 'post']])
+        self.assertEqual(list(Like.objects.values_list('value', flat=True)), ['Unlike'])
+        self.assertIn("rebuild_reaction_counts", out.getvalue())
+        call_command('rebuild_reaction_counts', stdout=io.StringIO())
+        post.refresh_from_db()
+        self.assertEqual((post.like_count, post.unlike_count), (0, 1))
@@ -0,0 +1,46 @@
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.test import override_settings
+from django.urls import reverse
+from home.metrics import request_metrics
+from home.models import *
+from home.cache import post_cache
+from rest_framework import status
+
+
+@override_settings(METRICS={'TOKEN': 'scrape-token', 'QUERY_BUDGET': 20})
+class MetricsTestCases(APITestCase):
+    metrics_url = '/metrics'
+
+    def setUp(self):
+        post_cache.clear()
+        request_metrics.reset()
+        self.user = MyUser.objects.create_user(username="dummy_one", password="Dummy1__")
+        self.post = Post.objects.create(author=self.user, body="Post", active=True)
+        token = RefreshToken.for_user(self.user).access_token
+        self.auth = {'HTTP_AUTHORIZATION': "Bearer " + str(token)}
+
+    def scrape(self):
+        res = self.client.get(self.metrics_url, HTTP_AUTHORIZATION="Bearer scrape-token")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['Content-Type'].startswith('text/plain'))
+        return res.content.decode()
+
+    def test_records_latency_queries_and_size_per_route(self):
+        for _ in range(3):
+            self.client.get(reverse('reaction-count', kwargs={'post_id': self.post.id}), **self.auth)
+        body = self.scrape()
+        self.assertIn('tradecore_http_request_duration_seconds_count{route="reaction-count",method="GET",status="200"} 3', body)
+        self.assertIn('tradecore_http_request_queries_count{route="reaction-count",method="GET"} 3', body)
+        self.assertIn('tradecore_http_response_size_bytes_bucket{route="reaction-count",method="GET",le="+Inf"} 3', body)
+        self.assertIn('tradecore_post_cache_hits_total', body)
+
+    def test_query_budget(self):
+        with override_settings(METRICS={'TOKEN': 'scrape-token', 'QUERY_BUDGET': 0}):
+            self.client.get(f'/api/v1/posts/{self.post.id}/', **self.auth)
+        self.assertIn('tradecore_http_requests_over_query_budget_total{route="posts-detail",method="GET"} 1', self.scrape())
+
+    def test_scrape_requires_token(self):
+        self.assertEqual(self.client.get(self.metrics_url).status_code, status.HTTP_401_UNAUTHORIZED)
+        with override_settings(METRICS={'TOKEN': None, 'QUERY_BUDGET': 20}):
+            self.assertEqual(self.client.get(self.metrics_url).status_code, status.HTTP_404_NOT_FOUND)
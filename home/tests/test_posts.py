@@ -0,0 +1,295 @@
+import json
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.test import override_settings
+from django.urls import reverse
+from home.models import *
+from home.cache import post_cache, LocalBackend, PostCache
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from django.utils import timezone
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from home.api.v1.serializers import LikeSerializer, PostSerializer, like_rows, post_rows
+
+
+class PostPaginationTestCases(APITestCase):
+    posts_url = '/api/v1/posts/'
+
+    def setUp(self):
+        post_cache.clear()
+        self.user_one = MyUser.objects.create_user(username="dummy_one", password="Dummy1__")
+        self.user_two = MyUser.objects.create_user(username="dummy_two", password="Dummy2__")
+        token = RefreshToken.for_user(self.user_one).access_token
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + str(token))
+        self.posts = [
+            Post.objects.create(author=self.user_one if i % 2 else self.user_two, body=f"Post {i}", active=True)
+            for i in range(7)
+        ]
+
+    def _walk(self, url):
+        ids = []
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            ids += [post['id'] for post in res.data['results']]
+            url = res.data['next']
+        return ids
+
+    def test_list_walks_every_post_newest_first(self):
+        ids = self._walk(self.posts_url + '?page_size=3')
+        self.assertEqual(ids, sorted([post.id for post in self.posts], reverse=True))
+
+    def test_user_posts_walks_only_authors_posts(self):
+        url = reverse('user-posts', kwargs={'user_id': self.user_one.id}) + '?page_size=2'
+        ids = self._walk(url)
+        expected = sorted([post.id for post in self.posts if post.author_id == self.user_one.id], reverse=True)
+        self.assertEqual(ids, expected)
+
+    @override_settings(POSTS_MAX_PAGE_SIZE=4)
+    def test_page_size_is_capped(self):
+        res = self.client.get(self.posts_url + '?page_size=1000')
+        self.assertEqual(len(res.data['results']), 4)
+        self.assertIsNotNone(res.data['next'])
+
+    def test_invalid_cursor(self):
+        res = self.client.get(self.posts_url + '?cursor=garbage')
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def _stream(self, url):
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        return json.loads(b''.join(res.streaming_content))
+
+    @override_settings(STREAM_CHUNK_SIZE=2)
+    def test_stream_returns_every_post(self):
+        posts = self._stream(self.posts_url + '?stream=1')
+        self.assertEqual([post['id'] for post in posts], sorted([post.id for post in self.posts], reverse=True))
+        self.assertEqual(posts[-1]['body'], "Post 0")
+
+    def test_stream_user_posts(self):
+        url = reverse('user-posts', kwargs={'user_id': self.user_two.id}) + '?stream=true'
+        expected = sorted([post.id for post in self.posts if post.author_id == self.user_two.id], reverse=True)
+        self.assertEqual([post['id'] for post in self._stream(url)], expected)
+
+    def test_stream_empty(self):
+        Post.objects.all().delete()
+        self.assertEqual(self._stream(self.posts_url + '?stream=1'), [])
+
+
+class SparseFieldsTestCases(APITestCase):
+    posts_url = '/api/v1/posts/'
+
+    def setUp(self):
+        post_cache.clear()
+        self.user = MyUser.objects.create_user(username="dummy_one", password="Dummy1__")
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + str(token))
+        self.posts = [Post.objects.create(author=self.user, body=f"Post {i}" * 100, active=True) for i in range(3)]
+
+    def test_list_returns_only_requested_fields(self):
+        res = self.client.get(self.posts_url + '?fields=created_at,id,author')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([list(post) for post in res.data['results']], [['id', 'author', 'created_at']] * 3)
+        self.assertEqual([post['id'] for post in res.data['results']], [post.id for post in reversed(self.posts)])
+
+    def test_sparse_fields_do_not_select_body(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.posts_url + '?fields=id,author')
+            self.client.get(reverse('user-posts', kwargs={'user_id': self.user.id}) + '?fields=author')
+        self.assertFalse([query for query in queries if '"body"' in query['sql']])
+
+    def test_retrieve_and_user_posts(self):
+        post = self.posts[0]
+        res = self.client.get(f'{self.posts_url}{post.id}/?fields=body')
+        self.assertEqual(res.data, {'body': post.body})
+        res = self.client.get(reverse('user-posts', kwargs={'user_id': self.user.id}) + '?fields=like_count')
+        self.assertEqual(res.data['results'], [{'like_count': 0}] * 3)
+
+    def test_unknown_field(self):
+        res = self.client.get(self.posts_url + '?fields=id,password')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('password', res.data['fields'][0])
+
+    def test_full_payload_without_fields(self):
+        res = self.client.get(f'{self.posts_url}{self.posts[0].id}/?fields=')
+        self.assertEqual(set(res.data), set(PostSerializer.Meta.fields))
+
+
+class ConditionalGetTestCases(APITestCase):
+    posts_url = '/api/v1/posts/'
+
+    def setUp(self):
+        post_cache.clear()
+        self.user = MyUser.objects.create_user(username="dummy_one", password="Dummy1__")
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + str(token))
+        self.post = Post.objects.create(author=self.user, body="Post", active=True)
+
+    def assertRevalidates(self, url, last_modified=True):
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        etag = res['ETag']
+        self.assertEqual(res.has_header('Last-Modified'), last_modified)
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['ETag'], etag)
+        self.assertEqual(res.content, b'')
+        return etag
+
+    def test_retrieve(self):
+        url = f'{self.posts_url}{self.post.id}/'
+        etag = self.assertRevalidates(url)
+        self.assertNotEqual(self.client.get(url + '?fields=id')['ETag'], etag)
+        self.client.post('/api/v1/likes/', {'post': self.post.id, 'value': 'Like'}, format='json')
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['like_count'], 1)
+
+    def test_retrieve_sparse_miss_reads_only_requested_columns(self):
+        url = f'{self.posts_url}{self.post.id}/?fields=id,like_count'
+        with CaptureQueriesContext(connection) as queries:
+            etag = self.assertRevalidates(url)
+        self.assertFalse(any('"body"' in query['sql'] for query in queries.captured_queries))
+        self.client.get(f'{self.posts_url}{self.post.id}/')
+        # the cached full payload gives the same representation
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_list_changes_with_new_and_deleted_posts(self):
+        etag = self.assertRevalidates(self.posts_url, last_modified=False)
+        other = Post.objects.create(author=self.user, body="Other", active=True)
+        res = self.client.get(self.posts_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        etag = res['ETag']
+        other.delete()
+        self.assertNotEqual(self.client.get(self.posts_url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_user_posts_validators_cost_no_collection_query(self):
+        url = reverse('user-posts', kwargs={'user_id': self.user.id})
+        with CaptureQueriesContext(connection) as queries:
+            etag = self.assertRevalidates(url, last_modified=False)
+        self.assertFalse(any('COUNT(' in query['sql'] or 'MAX(' in query['sql'] for query in queries.captured_queries))
+        # a removed post changes the page, If-Modified-Since alone never answers 304
+        Post.objects.create(author=self.user, body="Other", active=True).delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        self.post.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+        res = self.client.get(url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_reactions(self):
+        url = reverse('reaction-count', kwargs={'post_id': self.post.id})
+        etag = self.assertRevalidates(url)
+        self.client.post('/api/v1/likes/', {'post': self.post.id, 'value': 'Unlike'}, format='json')
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['num_of_unlikes'], 1)
+
+
+class ValuesRowSerializerTestCases(APITestCase):
+
+    def setUp(self):
+        self.users = [MyUser.objects.create_user(username=f"dummy_{i}", password="Dummy1__") for i in range(2)]
+        self.posts = [Post.objects.create(author=self.users[i % 2], body=f"Post é {i}", active=bool(i % 2)) for i in range(4)]
+        for i, post in enumerate(self.posts):
+            Like.objects.create(user=self.users[0], post=post, value='Like' if i % 2 else 'Unlike')
+
+    def assertSameBytes(self, serializer_class, fast, queryset):
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(fast.serialize(queryset)), renderer.render(serializer_class(queryset, many=True).data))
+
+    def test_posts_match_model_serializer(self):
+        self.assertSameBytes(PostSerializer, post_rows, Post.objects.order_by('id'))
+
+    def test_likes_match_model_serializer(self):
+        self.assertSameBytes(LikeSerializer, like_rows, Like.objects.order_by('id'))
+
+    def test_posts_match_in_active_timezone(self):
+        with timezone.override('Asia/Karachi'):
+            self.assertSameBytes(PostSerializer, post_rows, Post.objects.order_by('id'))
+
+
+class PostCacheTestCases(APITestCase):
+    posts_url = '/api/v1/posts/'
+
+    def setUp(self):
+        post_cache.clear()
+        self.user = MyUser.objects.create_user(username="dummy_one", password="Dummy1__")
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + str(token))
+        self.post = Post.objects.create(author=self.user, body="Post", active=True)
+
+    def test_retrieve_is_served_from_cache(self):
+        url = f"{self.posts_url}{self.post.id}/"
+        self.client.get(url)
+        with self.assertNumQueries(1):
+            # only the user lookup done by authentication
+            res = self.client.get(url)
+        self.assertEqual(res.data['body'], "Post")
+
+    def test_update_invalidates_cached_post(self):
+        url = f"{self.posts_url}{self.post.id}/"
+        self.client.get(url)
+        self.client.put(url, {'body': "Edited", 'active': True}, format='json')
+        self.assertEqual(self.client.get(url).data['body'], "Edited")
+
+    def test_like_invalidates_cached_post(self):
+        url = f"{self.posts_url}{self.post.id}/"
+        self.client.get(url)
+        self.client.post('/api/v1/likes/', {'post': self.post.id, 'value': 'Like'}, format='json')
+        self.assertEqual(self.client.get(url).data['like_count'], 1)
+
+    def test_destroy_invalidates_cached_post(self):
+        url = f"{self.posts_url}{self.post.id}/"
+        self.client.get(url)
+        self.client.delete(url)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_clear_only_drops_post_entries(self):
+        backend = LocalBackend(max_entries=10, ttl=60)
+        cache = PostCache(backend)
+        backend.set_many({cache.make_key(1): {'id': 1}, 'db-pin:1': True})
+        cache.clear()
+        self.assertEqual(backend.get_many([cache.make_key(1), 'db-pin:1']), {'db-pin:1': True})
+
+    def test_local_backend_lru_and_ttl(self):
+        backend = LocalBackend(max_entries=2, ttl=60)
+        backend.set_many({'a': 1, 'b': 2})
+        backend.get_many(['a'])
+        backend.set_many({'c': 3})
+        self.assertEqual(backend.get_many(['a', 'b', 'c']), {'a': 1, 'c': 3})
+        self.assertEqual(backend.evictions, 1)
+        backend.ttl = 0
+        backend.set_many({'d': 4})
+        self.assertEqual(backend.get_many(['d']), {})
+
+
+class PostBulkCreateTestCases(APITestCase):
+    bulk_url = '/api/v1/posts/bulk/'
+
+    def setUp(self):
+        post_cache.clear()
+        self.user = MyUser.objects.create_user(username="dummy_one", password="Dummy1__")
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + str(token))
+
+    def test_bulk_create_posts(self):
+        items = [{'body': f"Post {i}", 'active': True} for i in range(5)]
+        res = self.client.post(self.bulk_url, items, format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([post['body'] for post in res.data['results']], [item['body'] for item in items])
+        self.assertEqual(Post.objects.filter(author=self.user).count(), 5)
+
+    def test_bulk_create_is_all_or_nothing(self):
+        items = [{'body': "Post", 'active': True}, {'body': "", 'active': True}]
+        res = self.client.post(self.bulk_url, items, format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data['errors'][0], {})
+        self.assertIn('body', res.data['errors'][1])
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(BULK_MAX_ITEMS=2)
+    def test_bulk_create_rejects_oversized_batches(self):
+        res = self.client.post(self.bulk_url, [{'body': "Post", 'active': True}] * 3, format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,80 @@
+import json
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from home.cache import post_cache
+from home.models import *
+from home.reaper import reap_post
+from rest_framework import status
+import home.tasks  # noqa: F401
+
+REAPER = {'BATCH_SIZE': 2, 'PAUSE': 0, 'MAX_BATCHES': 3}
+
+
+class PostReaperTestCases(APITestCase):
+
+    def setUp(self):
+        post_cache.clear()
+        self.author = MyUser.objects.create_user(username="dummy_one", password="Dummy1__")
+        self.readers = [MyUser.objects.create_user(username=f"reader_{i}", password="Dummy1__") for i in range(5)]
+        self.post = Post.objects.create(author=self.author, body="Viral post", active=True)
+        self.other = Post.objects.create(author=self.author, body="Other post", active=True)
+        for reader in self.readers:
+            Like.objects.create(user=reader, post=self.post)
+            FeedEntry.objects.create(user=reader, post=self.post, author=self.author, created_at=self.post.created_at)
+        Like.objects.create(user=self.readers[0], post=self.other)
+        token = RefreshToken.for_user(self.author).access_token
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + str(token))
+
+    def test_destroy_hides_post_and_defers_the_cascade(self):
+        url = f'/api/v1/posts/{self.post.id}/'
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.delete(url)
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(any('DELETE' in query['sql'] for query in queries.captured_queries))
+        self.assertEqual(Like.objects.filter(post=self.post.id).count(), 5)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual([post['id'] for post in self.client.get('/api/v1/posts/').data['results']], [self.other.id])
+        self.assertEqual(self.client.get(f'/api/v1/post-reactions/{self.post.id}').status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get('/api/v1/posts/search/', {'q': 'post'}).data['results'][0]['id'], self.other.id)
+        self.assertEqual(len(self.client.get('/api/v1/posts/search/', {'q': 'post'}).data['results']), 1)
+        res = self.client.post('/api/v1/likes/', {'post': self.post.id, 'value': 'Like'}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_likes_of_deleted_posts_are_hidden(self):
+        like = Like.objects.get(user=self.readers[0], post=self.post)
+        self.client.delete(f'/api/v1/posts/{self.post.id}/')
+        self.assertEqual([item['post'] for item in self.client.get('/api/v1/likes/').data], [self.other.id])
+        url = f'/api/v1/likes/{like.id}/'
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        res = self.client.put(url, {'post': self.post.id, 'value': 'Unlike'}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(Like.objects.get(id=like.id).value, 'Like')
+
+    def test_reaper_deletes_in_bounded_batches(self):
+        Post.objects.filter(id=self.post.id).update(deleted_at=self.post.created_at)
+        with self.settings(POST_REAPER=REAPER):
+            # 5 likes and 5 feed entries in batches of 2, at most 3 full batches per run
+            self.assertFalse(reap_post(self.post.id))
+            self.assertEqual(Like.objects.filter(post=self.post.id).count(), 0)
+            self.assertEqual(FeedEntry.objects.filter(post=self.post.id).count(), 3)
+            self.assertTrue(Post.all_objects.filter(id=self.post.id).exists())
+            self.assertTrue(reap_post(self.post.id))
+        self.assertFalse(Post.all_objects.filter(id=self.post.id).exists())
+        self.assertEqual(FeedEntry.objects.filter(post=self.post.id).count(), 0)
+        self.assertEqual(Like.objects.filter(post=self.other.id).count(), 1)
+
+    def test_reap_post_job_continues_until_done(self):
+        self.client.delete(f'/api/v1/posts/{self.post.id}/')
+        job = Job.objects.get(task='reap_post')
+        with self.settings(POST_REAPER=REAPER):
+            home.tasks.perform_post_reap(json.loads(job.payload))
+            follow_up = Job.objects.exclude(id=job.id).get(task='reap_post')
+            self.assertEqual(json.loads(follow_up.payload), {'post_id': self.post.id})
+            home.tasks.perform_post_reap(json.loads(follow_up.payload))
+        self.assertEqual(Job.objects.filter(task='reap_post').count(), 2)
+        self.assertFalse(Post.all_objects.filter(id=self.post.id).exists())
+        self.assertTrue(Post.objects.filter(id=self.other.id).exists())
@@ -0,0 +1,59 @@
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from home.cache import post_cache
+from home.models import *
+from home.search import fts5_query
+from rest_framework import status
+
+
+class PostSearchTestCases(APITestCase):
+    search_url = '/api/v1/posts/search/'
+
+    def setUp(self):
+        post_cache.clear()
+        self.user = MyUser.objects.create_user(username="dummy_one", password="Dummy1__")
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + str(token))
+
+    def publish(self, body):
+        res = self.client.post('/api/v1/posts/', {'body': body, 'active': True}, format='json')
+        return res.data['id']
+
+    def search(self, q, **params):
+        res = self.client.get(self.search_url, dict(q=q, **params))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_ranked_matches(self):
+        once = self.publish("Markets opened higher on trade news")
+        twice = self.publish("Trade deal: trade volumes up")
+        self.publish("Nothing relevant here")
+        self.assertEqual([post['id'] for post in self.search("trade")['results']], [twice, once])
+        self.assertEqual([post['id'] for post in self.search("trade markets")['results']], [once])
+
+    def test_index_follows_update_and_destroy(self):
+        post_id = self.publish("Old headline")
+        self.client.put(f'/api/v1/posts/{post_id}/', {'body': "Fresh headline", 'active': True}, format='json')
+        self.assertEqual(self.search("old")['results'], [])
+        self.assertEqual([post['id'] for post in self.search("fresh")['results']], [post_id])
+        self.client.delete(f'/api/v1/posts/{post_id}/')
+        self.assertEqual(self.search("fresh")['results'], [])
+
+    def test_paginates(self):
+        ids = [self.publish(f"Earnings report {i}") for i in range(5)]
+        found, url = [], self.search_url + '?q=earnings&page_size=2&fields=id'
+        while url:
+            data = self.client.get(url).data
+            found += [post['id'] for post in data['results']]
+            url = data['next']
+        self.assertEqual(sorted(found), sorted(ids))
+
+    def test_query_syntax_is_not_interpreted(self):
+        post_id = self.publish('Shares "rally" AND NOT fall')
+        self.assertEqual([post['id'] for post in self.search('rally" OR (')['results']], [])
+        self.assertEqual([post['id'] for post in self.search('NOT fall')['results']], [post_id])
+        self.assertEqual(fts5_query('a "b'), '"a" """b"')
+
+    def test_requires_query(self):
+        res = self.client.get(self.search_url)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
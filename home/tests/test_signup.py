@@ -0,0 +1,80 @@
+from unittest import mock
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.test import SimpleTestCase
+from django.urls import reverse
+from validate_email.email_address import EmailAddress
+from validate_email.exceptions import AddressNotDeliverableError, DNSTimeoutError, NoMXError
+from home.email_verification import EmailVerifier
+from home.models import *
+from rest_framework import status
+
+
+class SignupTestCases(APITestCase):
+    signup_url = '/api/v1/signup/'
+
+    user_data = {
+        "email": "dummy@gmail.com",
+        "username": "dummy",
+        "first_name": "Dummy",
+        "last_name": "User",
+        "password": "Dummy__1"
+    }
+
+    def test_signup_defers_verification_and_enrichment(self):
+        res = self.client.post(self.signup_url, self.user_data, format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['email_verification'], EMAIL_PENDING)
+        self.assertEqual(sorted(Job.objects.values_list('task', flat=True)), ['enrich_signup', 'verify_email'])
+
+    def test_signup_rejects_malformed_email(self):
+        res = self.client.post(self.signup_url, {**self.user_data, 'email': 'dummy@'}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(MyUser.objects.exists())
+
+    def test_email_verification_state(self):
+        user = MyUser.objects.create_user(username="dummy", email="dummy@gmail.com", password="Dummy__1")
+        token = RefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + str(token))
+        res = self.client.get(reverse('email-verification'))
+        self.assertEqual(res.data, {"email": "dummy@gmail.com", "email_verification": EMAIL_PENDING})
+
+
+@mock.patch('home.email_verification.smtp_check', return_value=True)
+@mock.patch('home.email_verification.dns_check', return_value=['mx.gmail.com'])
+class EmailVerifierTestCases(SimpleTestCase):
+    config = {
+        'DNS_TIMEOUT': 1, 'SMTP_TIMEOUT': 1, 'HELO_HOST': 'my.host.name', 'FROM_ADDRESS': 'my@from.addr.ess',
+        'MX_CACHE_SIZE': 10, 'MX_CACHE_TTL': 60,
+    }
+
+    def test_mx_records_are_cached_per_domain(self, dns_check, smtp_check):
+        verifier = EmailVerifier(self.config)
+        self.assertEqual(verifier.verify('one@gmail.com'), EMAIL_VALID)
+        self.assertEqual(verifier.verify('two@gmail.com'), EMAIL_VALID)
+        self.assertEqual(dns_check.call_count, 1)
+
+    def test_undeliverable_and_missing_mx(self, dns_check, smtp_check):
+        verifier = EmailVerifier(self.config)
+        smtp_check.side_effect = AddressNotDeliverableError({})
+        self.assertEqual(verifier.verify('one@gmail.com'), EMAIL_INVALID)
+        dns_check.side_effect = NoMXError
+        self.assertEqual(verifier.verify('one@nomx.example'), EMAIL_INVALID)
+        self.assertEqual(verifier.verify('two@nomx.example'), EMAIL_INVALID)
+        self.assertEqual(dns_check.call_count, 2)
+
+    def test_cached_dns_error_is_raised_afresh(self, dns_check, smtp_check):
+        verifier = EmailVerifier(self.config)
+        dns_check.side_effect = NoMXError
+        errors = []
+        for _ in range(2):
+            with self.assertRaises(NoMXError) as raised:
+                verifier.mx_records(EmailAddress(address='one@nomx.example'))
+            errors.append(raised.exception)
+        self.assertEqual(dns_check.call_count, 1)
+        self.assertIsNot(errors[0], errors[1])
+
+    def test_dns_timeout_is_retried(self, dns_check, smtp_check):
+        dns_check.side_effect = DNSTimeoutError
+        with self.assertRaises(DNSTimeoutError):
+            EmailVerifier(self.config).verify('one@gmail.com')
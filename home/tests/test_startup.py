@@ -0,0 +1,89 @@
+import os
+import tempfile
+import time
+import environ
+from unittest import mock
+from django.test import SimpleTestCase
+from home.management.commands.import_report import parse_importtime
+from tradecore import secret_manager
+
+
+class SecretSnapshotTestCases(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'snapshot.env')
+        self.env = environ.Env()
+        self.addCleanup(os.environ.pop, 'SNAPSHOT_TEST_VALUE', None)
+
+    def load(self):
+        return secret_manager.load_secret_settings(self.env, self.path, max_age=60, timeout=1, settings_name='django_settings')
+
+    def write_snapshot(self, value, age=0):
+        with open(self.path, 'w') as snapshot_file:
+            snapshot_file.write(f"SNAPSHOT_TEST_VALUE={value}\n")
+        os.chmod(self.path, 0o600)
+        os.utime(self.path, (time.time() - age, time.time() - age))
+
+    def test_fresh_snapshot_skips_secret_manager(self):
+        self.write_snapshot('cached')
+        with mock.patch.object(secret_manager, '_fetch') as fetch:
+            self.assertEqual(self.load(), 'snapshot')
+        fetch.assert_not_called()
+        self.assertEqual(os.environ['SNAPSHOT_TEST_VALUE'], 'cached')
+
+    def test_fetch_refreshes_snapshot(self):
+        self.write_snapshot('old', age=120)
+        with mock.patch.object(secret_manager, '_fetch', return_value="SNAPSHOT_TEST_VALUE=new\n"):
+            self.assertEqual(self.load(), 'secret manager')
+        with open(self.path) as snapshot_file:
+            self.assertEqual(snapshot_file.read(), "SNAPSHOT_TEST_VALUE=new\n")
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o600)
+
+    def test_unreachable_secret_manager_falls_back_to_stale_snapshot(self):
+        self.write_snapshot('stale', age=120)
+        with mock.patch.object(secret_manager, '_fetch', side_effect=TimeoutError):
+            self.assertEqual(self.load(), 'stale snapshot')
+        self.assertEqual(os.environ['SNAPSHOT_TEST_VALUE'], 'stale')
+        os.remove(self.path)
+        with mock.patch.object(secret_manager, '_fetch', side_effect=TimeoutError):
+            self.assertIsNone(self.load())
+
+    def test_untrusted_snapshot_is_ignored(self):
+        self.write_snapshot('planted')
+        os.chmod(self.path, 0o644)
+        with mock.patch.object(secret_manager, '_fetch', side_effect=TimeoutError):
+            self.assertIsNone(self.load())
+        os.chmod(self.path, 0o600)
+        with mock.patch.object(secret_manager.os, 'getuid', return_value=os.getuid() + 1):
+            with mock.patch.object(secret_manager, '_fetch', side_effect=TimeoutError):
+                self.assertIsNone(self.load())
+        link = self.path + '.link'
+        os.symlink(self.path, link)
+        self.path = link
+        with mock.patch.object(secret_manager, '_fetch', side_effect=TimeoutError):
+            self.assertIsNone(self.load())
+        self.assertNotIn('SNAPSHOT_TEST_VALUE', os.environ)
+
+    def test_snapshot_is_written_to_a_fresh_file(self):
+        # a symlink where a predictable temporary name would be is left alone
+        target = self.path + '.target'
+        with mock.patch.object(secret_manager, '_fetch', return_value="SNAPSHOT_TEST_VALUE=new\n"):
+            with mock.patch.object(secret_manager.os, 'getpid', return_value=1):
+                os.symlink(target, f"{self.path}.1.tmp")
+                self.assertEqual(self.load(), 'secret manager')
+        self.assertFalse(os.path.exists(target))
+        self.assertEqual(os.lstat(self.path).st_mode & 0o777, 0o600)
+
+
+class ImportReportTestCases(SimpleTestCase):
+
+    def test_parse_importtime(self):
+        output = "\n".join([
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 |   holidays.countries",
+            "import time:       300 |        420 | holidays",
+            "Traceback (most recent call last):",
+        ])
+        self.assertEqual(parse_importtime(output), [('holidays.countries', 120, 120, 1), ('holidays', 300, 420, 0)])
@@ -0,0 +1,105 @@
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.test import SimpleTestCase
+from home.cache import post_cache
+from home.models import *
+from home.trending import LocalTrending, trending
+from rest_framework import status
+
+CONFIG = {'HALF_LIFE': 3600, 'BUCKET': 86400, 'MAX_CANDIDATES': 3}
+
+
+class Clock:
+
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TrendingEngineTestCases(SimpleTestCase):
+
+    def setUp(self):
+        self.clock = Clock(86400 * 100)
+        self.engine = LocalTrending(CONFIG, clock=self.clock)
+
+    def test_recent_likes_outrank_old_ones(self):
+        self.engine.record([1, 1])
+        self.clock.now += 2 * 3600
+        self.engine.record([2])
+        (first, first_score), (second, second_score) = self.engine.top(10)
+        self.assertEqual((first, second), (2, 1))
+        # two likes two half lives ago are worth half a like now
+        self.assertAlmostEqual(first_score, 1.0)
+        self.assertAlmostEqual(second_score, 0.5)
+
+    def test_new_bucket_keeps_order_and_scores(self):
+        self.engine.record([1])
+        self.clock.now += 3600
+        self.engine.record([2, 2])
+        self.clock.now += 86400
+        self.assertEqual([post_id for post_id, _ in self.engine.top(10)], [2, 1])
+        self.engine.record([3])
+        scores = dict(self.engine.top(10))
+        self.assertAlmostEqual(scores[3], 1.0)
+        self.assertAlmostEqual(scores[2], 2 * 2 ** -24)
+
+    def test_candidates_are_bounded(self):
+        for post_id in range(1, 11):
+            self.engine.record([post_id] * post_id)
+        self.assertLessEqual(len(self.engine._scores), 2 * CONFIG['MAX_CANDIDATES'])
+        self.assertEqual([post_id for post_id, _ in self.engine.top(10)], [10, 9, 8])
+
+    def test_discard(self):
+        self.engine.record([1, 2])
+        self.engine.discard(1)
+        self.assertEqual([post_id for post_id, _ in self.engine.top(10)], [2])
+
+
+class TrendingEndpointTestCases(APITestCase):
+    trending_url = '/api/v1/posts/trending/'
+
+    def setUp(self):
+        post_cache.clear()
+        trending.clear()
+        self.user = MyUser.objects.create_user(username="dummy_one", password="Dummy1__")
+        self.posts = [Post.objects.create(body=f"Post {i}", author=self.user, active=True) for i in range(3)]
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + str(token))
+
+    def like(self, user, post, value='Like'):
+        token = RefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + str(token))
+        self.client.post('/api/v1/likes/', {'post': post.id, 'value': value}, format='json')
+
+    def test_ranks_posts_by_likes(self):
+        other = MyUser.objects.create_user(username="dummy_two", password="Dummy1__")
+        self.like(self.user, self.posts[2])
+        self.like(other, self.posts[2])
+        self.like(self.user, self.posts[0])
+        # repeating a like or unliking does not add to the score
+        self.like(self.user, self.posts[0])
+        self.like(other, self.posts[1], value='Unlike')
+        res = self.client.get(self.trending_url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([post['id'] for post in res.data['results']], [self.posts[2].id, self.posts[0].id])
+        res = self.client.get(self.trending_url, {'page_size': 1, 'fields': 'id'})
+        self.assertEqual(res.data['results'], [{'id': self.posts[2].id}])
+
+    def test_toggling_a_like_counts_once(self):
+        others = [MyUser.objects.create_user(username=f"other_{i}", password="Dummy1__") for i in range(2)]
+        for other in others:
+            self.like(other, self.posts[1])
+        for value in ['Like', 'Unlike'] * 3 + ['Like']:
+            self.like(self.user, self.posts[0], value=value)
+        res = self.client.get(self.trending_url)
+        self.assertEqual([post['id'] for post in res.data['results']], [self.posts[1].id, self.posts[0].id])
+        scores = dict(trending.top(10))
+        self.assertAlmostEqual(scores[self.posts[0].id] * 2, scores[self.posts[1].id], places=3)
+
+    def test_deleted_post_leaves_trending(self):
+        self.like(self.user, self.posts[0])
+        self.client.delete(f'/api/v1/posts/{self.posts[0].id}/')
+        res = self.client.get(self.trending_url)
+        self.assertEqual(res.data['results'], [])
@@ -0,0 +1,156 @@
+import threading
+import time
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+# Trending posts from likes with exponential time decay (forward decay).
+# A like at time t adds 2 ** ((t - bucket_start) / half_life) to its post, so
+# stored scores never need decaying in place: ranking by them is the same as
+# ranking by decayed scores. Once per BUCKET seconds the candidates are rescaled
+# onto the new bucket start, which keeps the numbers small without rescanning
+# likes. Only the MAX_CANDIDATES best posts are kept, so reading the top K costs
+# the same whatever the size of the Like table.
+
+
+class TrendingEngine:
+
+    def __init__(self, config, clock=time.time):
+        self.half_life = config['HALF_LIFE']
+        self.bucket_seconds = config['BUCKET']
+        self.max_candidates = config['MAX_CANDIDATES']
+        self.clock = clock
+
+    def bucket(self, now):
+        return int(now // self.bucket_seconds)
+
+    def weight(self, now, bucket):
+        # a like right now, in units of the bucket's start
+        return 2 ** ((now - bucket * self.bucket_seconds) / self.half_life)
+
+    def rescale_factor(self, old_bucket, new_bucket):
+        return 2 ** (-(new_bucket - old_bucket) * self.bucket_seconds / self.half_life)
+
+    def decay_to_now(self, score, now, bucket):
+        return score / self.weight(now, bucket)
+
+
+class LocalTrending(TrendingEngine):
+    # In-process candidates; each web process ranks the likes it served.
+
+    def __init__(self, config, clock=time.time):
+        super().__init__(config, clock)
+        self._scores = {}
+        self._bucket = self.bucket(clock())
+        self._top = None
+        self._lock = threading.Lock()
+
+    def _advance(self, now):
+        bucket = self.bucket(now)
+        if bucket != self._bucket:
+            factor = self.rescale_factor(self._bucket, bucket)
+            self._scores = {post_id: score * factor for post_id, score in self._scores.items()}
+            self._bucket = bucket
+            self._top = None
+        return bucket
+
+    def record(self, post_ids, amount=1):
+        now = self.clock()
+        with self._lock:
+            bucket = self._advance(now)
+            increment = amount * self.weight(now, bucket)
+            for post_id in post_ids:
+                self._scores[post_id] = self._scores.get(post_id, 0.0) + increment
+            if len(self._scores) > 2 * self.max_candidates:
+                # amortized trim back to the best MAX_CANDIDATES
+                best = sorted(self._scores.items(), key=lambda item: -item[1])[:self.max_candidates]
+                self._scores = dict(best)
+            self._top = None
+
+    def discard(self, post_id):
+        with self._lock:
+            if self._scores.pop(post_id, None) is not None:
+                self._top = None
+
+    def top(self, limit):
+        # [(post_id, decayed score)], best first
+        now = self.clock()
+        with self._lock:
+            bucket = self._advance(now)
+            if self._top is None:
+                self._top = sorted(self._scores.items(), key=lambda item: (-item[1], -item[0]))[:self.max_candidates]
+            top = self._top[:limit]
+        return [(post_id, self.decay_to_now(score, now, bucket)) for post_id, score in top]
+
+    def clear(self):
+        with self._lock:
+            self._scores = {}
+            self._top = None
+
+
+class RedisTrending(TrendingEngine):
+    # One sorted set per bucket, shared by all processes.
+
+    def __init__(self, config, url, clock=time.time, key_prefix='tradecore:trending:'):
+        super().__init__(config, clock)
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured("Trending with the redis backend requires the redis package")
+        if not url:
+            raise ImproperlyConfigured("Trending with the redis backend requires REDIS_URL")
+        self.client = redis.Redis.from_url(url)
+        self.key_prefix = key_prefix
+        self._known_bucket = None
+
+    def key(self, bucket):
+        return f"{self.key_prefix}{bucket}"
+
+    def _advance(self, now):
+        # the first process into a new bucket carries the old candidates over
+        bucket = self.bucket(now)
+        if bucket == self._known_bucket:
+            return bucket
+        previous = self.client.getset(self.key_prefix + 'current', bucket)
+        if previous is not None and int(previous) < bucket:
+            previous = int(previous)
+            self.client.zunionstore(self.key(bucket), {self.key(bucket): 1, self.key(previous): self.rescale_factor(previous, bucket)})
+            self.client.expire(self.key(previous), 2 * self.bucket_seconds)
+        self._known_bucket = bucket
+        return bucket
+
+    def record(self, post_ids, amount=1):
+        now = self.clock()
+        bucket = self._advance(now)
+        key = self.key(bucket)
+        increment = amount * self.weight(now, bucket)
+        pipeline = self.client.pipeline(transaction=False)
+        for post_id in post_ids:
+            pipeline.zincrby(key, increment, post_id)
+        pipeline.zremrangebyrank(key, 0, -(self.max_candidates + 1))
+        pipeline.execute()
+
+    def discard(self, post_id):
+        self.client.zrem(self.key(self.bucket(self.clock())), post_id)
+
+    def top(self, limit):
+        now = self.clock()
+        bucket = self._advance(now)
+        return [
+            (int(post_id), self.decay_to_now(score, now, bucket))
+            for post_id, score in self.client.zrevrange(self.key(bucket), 0, limit - 1, withscores=True)
+        ]
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.key_prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+
+def load_trending(config, cache_config):
+    # follows the post cache: shared through redis when it is, per process otherwise
+    if cache_config.get('BACKEND', 'local') == 'redis':
+        return RedisTrending(config, cache_config.get('LOCATION'))
+    return LocalTrending(config)
+
+
+trending = load_trending(settings.TRENDING, settings.POST_CACHE)
@@ -1,4 +1,9 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
 from django.shortcuts import render
+from django.utils.crypto import constant_time_compare
+from home.cache import post_cache
+from home.metrics import request_metrics
 
 
 def home(request):
@@ -11,3 +16,24 @@ def home(request):
         'packages': packages
     }
     return render(request, 'home/index.html', context)
+
+
+def metrics(request):
+    # Prometheus scrape endpoint, only served when METRICS_TOKEN is configured
+    token = settings.METRICS['TOKEN']
+    if not token:
+        raise Http404
+    if not constant_time_compare(request.META.get('HTTP_AUTHORIZATION', ''), f"Bearer {token}"):
+        return HttpResponse(status=401)
+    stats = post_cache.stats()
+    cache_lines = [
+        "# TYPE tradecore_post_cache_hits_total counter",
+        f"tradecore_post_cache_hits_total {stats['hits']}",
+        "# TYPE tradecore_post_cache_misses_total counter",
+        f"tradecore_post_cache_misses_total {stats['misses']}",
+        "# TYPE tradecore_post_cache_evictions_total counter",
+        f"tradecore_post_cache_evictions_total {stats['evictions']}",
+    ]
+    if stats['size'] is not None:
+        cache_lines += ["# TYPE tradecore_post_cache_entries gauge", f"tradecore_post_cache_entries {stats['size']}"]
+    return HttpResponse(request_metrics.render(cache_lines), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,80 @@
+import io
+import os
+import stat
+import tempfile
+import time
+
+
+def load_secret_settings(env, snapshot_path, max_age, timeout, settings_name):
+    # Read the Secret Manager settings payload into `env`.
+    # A local snapshot younger than `max_age` seconds is used as is, so most
+    # process starts never touch the network. Otherwise the payload is fetched
+    # with `timeout` and the snapshot refreshed; if the fetch fails a stale
+    # snapshot is still better than none. Returns where the settings came from.
+    snapshot, modified = _read_snapshot(snapshot_path)
+    if snapshot is not None and time.time() - modified < max_age:
+        env.read_env(io.StringIO(snapshot))
+        return 'snapshot'
+    try:
+        payload = _fetch(timeout, settings_name)
+    except Exception as error:
+        print(f"Could not load settings from Secret Manager: {error!r}")
+        if snapshot is not None:
+            env.read_env(io.StringIO(snapshot))
+            return 'stale snapshot'
+        return None
+    _write_snapshot(snapshot_path, payload)
+    env.read_env(io.StringIO(payload))
+    return 'secret manager'
+
+
+def _fetch(timeout, settings_name):
+    # google.auth waits GCE_METADATA_TIMEOUT seconds per metadata server probe,
+    # it must be set before the library is imported
+    os.environ.setdefault('GCE_METADATA_TIMEOUT', str(timeout))
+    import google.auth
+    from google.cloud import secretmanager
+
+    _, project = google.auth.default()
+    client = secretmanager.SecretManagerServiceClient()
+    name = client.secret_version_path(project, settings_name, "latest")
+    return client.access_secret_version(name=name, timeout=timeout).payload.data.decode("UTF-8")
+
+
+def default_snapshot_path():
+    # per-user directory, created 0700 by the first write
+    return os.path.join(tempfile.gettempdir(), f"tradecore-{os.getuid()}", "secrets-snapshot.env")
+
+
+def _read_snapshot(path):
+    # (content, mtime), or (None, None). The snapshot sets SECRET_KEY and
+    # DATABASE_URL, so only a regular file of ours that nobody else can read
+    # or write is trusted; anything else may have been planted.
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0))
+    except OSError:
+        return None, None
+    with os.fdopen(fd) as snapshot_file:
+        info = os.fstat(fd)
+        if not stat.S_ISREG(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+            print(f"Ignoring the settings snapshot {path}: not a private file of this user")
+            return None, None
+        return snapshot_file.read(), info.st_mtime
+
+
+def _write_snapshot(path, payload):
+    # written owner-only to a fresh file (mkstemp: O_EXCL, mode 0600) and
+    # renamed into place so readers never see half a file
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.secrets-snapshot-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as snapshot_file:
+                snapshot_file.write(payload)
+            os.replace(tmp_path, path)
+        except OSError:
+            os.unlink(tmp_path)
+            raise
+    except OSError as error:
+        print(f"Could not write the settings snapshot {path}: {error!r}")
@@ -11,13 +11,9 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 import os
-import io
 import environ
-import google.auth
-from google.cloud import secretmanager
-from google.auth.exceptions import DefaultCredentialsError
-from google.api_core.exceptions import PermissionDenied
 from datetime import timedelta
+from tradecore.secret_manager import default_snapshot_path, load_secret_settings
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -28,16 +24,19 @@ env.read_env(env_file)
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = env.bool("DEBUG", default=False)
 
-try:
-    # Pull secrets from Secret Manager
-    _, project = google.auth.default()
-    client = secretmanager.SecretManagerServiceClient()
-    settings_name = os.environ.get("SETTINGS_NAME", "django_settings")
-    name = client.secret_version_path(project, settings_name, "latest")
-    payload = client.access_secret_version(name=name).payload.data.decode("UTF-8")
-    env.read_env(io.StringIO(payload))
-except (DefaultCredentialsError, PermissionDenied):
-    pass
+# On by default on Cloud Run (K_SERVICE is set there) and wherever SETTINGS_NAME
+# names the secret, as in the Cloud Build steps; USE_SECRET_MANAGER overrides both
+if env.bool("USE_SECRET_MANAGER", default="SETTINGS_NAME" in os.environ or "K_SERVICE" in os.environ):
+    # Pull secrets from Secret Manager, through a local snapshot (see tradecore/secret_manager.py).
+    # The snapshot lives in a per-user directory of the tmp dir, the app directory
+    # is not writable in the image
+    load_secret_settings(
+        env,
+        snapshot_path=env.str("SECRETS_SNAPSHOT", default=default_snapshot_path()),
+        max_age=env.int("SECRETS_SNAPSHOT_MAX_AGE", default=3600),
+        timeout=env.float("SECRETS_TIMEOUT", default=3.0),
+        settings_name=env.str("SETTINGS_NAME", default="django_settings"),
+    )
 
 
 # Quick-start development settings - unsuitable for production
@@ -86,6 +85,8 @@ THIRD_PARTY_APPS = [
 INSTALLED_APPS += LOCAL_APPS + THIRD_PARTY_APPS
 
 MIDDLEWARE = [
+    'home.metrics.MetricsMiddleware',
+    'home.db_router.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -131,6 +132,24 @@ if env.str("DATABASE_URL", default=None):
         'default': env.db()
     }
 
+# Read replicas, one alias per URL: replica_0, replica_1, ... Safe API requests
+# read from them, see home/db_router.py. Tests mirror them onto default.
+for index, url in enumerate(env.list("DATABASE_REPLICA_URLS", default=[])):
+    DATABASES[f"replica_{index}"] = dict(env.db_url_config(url), TEST={'MIRROR': 'default'})
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias.startswith('replica_')]
+DATABASE_ROUTERS = ['home.db_router.ReplicaRouter']
+
+# Persistent connections, reused for DB_CONN_MAX_AGE seconds (0 closes them after
+# every request). With DB_CONN_HEALTH_CHECKS a reused connection is pinged first.
+for database in DATABASES.values():
+    database.setdefault('CONN_MAX_AGE', env.int("DB_CONN_MAX_AGE", default=60))
+DB_CONN_HEALTH_CHECKS = env.bool("DB_CONN_HEALTH_CHECKS", default=False)
+
+# Seconds a user's reads stay on the primary after a write (read-your-writes),
+# and how often an unreachable replica is retried
+DB_REPLICA_STICKY_SECONDS = env.int("DB_REPLICA_STICKY_SECONDS", default=10)
+DB_REPLICA_HEALTH_CHECK_INTERVAL = env.int("DB_REPLICA_HEALTH_CHECK_INTERVAL", default=30)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -191,10 +210,117 @@ REST_AUTH_REGISTER_SERIALIZERS = {
 }
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'home.api.v1.authentication.CachedJWTAuthentication',
     ],
 }
 
+# Verified access tokens kept per process, never past the token's own expiry
+JWT_CACHE = {
+    'MAX_ENTRIES': env.int("JWT_CACHE_MAX_ENTRIES", default=10000),
+    'TTL': env.int("JWT_CACHE_TTL", default=300),
+}
+
+# Materialized home feeds: entries kept per user and followers written per INSERT
+FEED = {
+    'MAX_ENTRIES': env.int("FEED_MAX_ENTRIES", default=500),
+    'FAN_OUT_CHUNK': env.int("FEED_FAN_OUT_CHUNK", default=1000),
+}
+
+# Per-route request metrics, scraped from /metrics with "Authorization: Bearer <TOKEN>".
+# Requests running more than QUERY_BUDGET SQL queries are counted and logged.
+METRICS = {
+    'TOKEN': env.str("METRICS_TOKEN", default=None),
+    'QUERY_BUDGET': env.int("METRICS_QUERY_BUDGET", default=20),
+}
+
+# Full-text search over post bodies (Postgres text search configuration)
+POST_SEARCH = {
+    'CONFIG': env.str("POST_SEARCH_CONFIG", default="english"),
+}
+
+# Trending posts: likes decay with HALF_LIFE seconds, scores are rebased every
+# BUCKET seconds and only the best MAX_CANDIDATES posts are tracked. Scores live
+# where the post cache does: with the local backend every process ranks only
+# the likes it served and starts empty after a restart, so deployments with
+# more than one process need the redis backend (REDIS_URL) for one shared ranking.
+TRENDING = {
+    'HALF_LIFE': env.int("TRENDING_HALF_LIFE", default=6 * 3600),
+    'BUCKET': env.int("TRENDING_BUCKET", default=24 * 3600),
+    'MAX_CANDIDATES': env.int("TRENDING_MAX_CANDIDATES", default=1000),
+    'TOP_K': env.int("TRENDING_TOP_K", default=50),
+}
+
+# Largest batch accepted by the posts/likes bulk endpoints
+BULK_MAX_ITEMS = env.int("BULK_MAX_ITEMS", default=500)
+
+# Keyset pagination for post listings
+POSTS_PAGE_SIZE = env.int("POSTS_PAGE_SIZE", default=20)
+POSTS_MAX_PAGE_SIZE = env.int("POSTS_MAX_PAGE_SIZE", default=100)
+
+# Rows fetched per round trip when a listing is streamed (?stream=1)
+STREAM_CHUNK_SIZE = env.int("STREAM_CHUNK_SIZE", default=2000)
+
+# Read-through cache for serialized posts ("local" in-process LRU or "redis").
+# Invalidation only reaches the process that made the write with "local", so it
+# is the default only when there is no REDIS_URL to share a cache through.
+POST_CACHE = {
+    'BACKEND': env.str("POST_CACHE_BACKEND", default="redis" if os.environ.get("REDIS_URL") else "local"),
+    'LOCATION': env.str("REDIS_URL", default=None),
+    'TTL': env.int("POST_CACHE_TTL", default=300),
+    'MAX_ENTRIES': env.int("POST_CACHE_MAX_ENTRIES", default=10000),
+}
+
+# Database backed job queue, worked by `manage.py run_jobs`
+JOB_QUEUE = {
+    'CONCURRENCY': env.int("JOB_CONCURRENCY", default=4),
+    'BATCH_SIZE': env.int("JOB_BATCH_SIZE", default=50),
+    'MAX_ATTEMPTS': env.int("JOB_MAX_ATTEMPTS", default=5),
+    'BACKOFF_BASE': env.float("JOB_BACKOFF_BASE", default=2.0),
+    'BACKOFF_MAX': env.float("JOB_BACKOFF_MAX", default=600.0),
+    'LEASE_TIMEOUT': env.int("JOB_LEASE_TIMEOUT", default=600),
+    'POLL_INTERVAL': env.float("JOB_POLL_INTERVAL", default=1.0),
+}
+
+# Soft-deleted posts are removed by the reap_post job: BATCH_SIZE reactions per
+# DELETE, PAUSE seconds between batches, at most MAX_BATCHES per job run
+POST_REAPER = {
+    'BATCH_SIZE': env.int("POST_REAPER_BATCH_SIZE", default=500),
+    'PAUSE': env.float("POST_REAPER_PAUSE", default=0.05),
+    'MAX_BATCHES': env.int("POST_REAPER_MAX_BATCHES", default=200),
+}
+
+# `manage.py archive_posts` moves posts older than AFTER_DAYS and their likes
+# to the archive tables, BATCH_SIZE posts at a time and at most ROW_BATCH_SIZE
+# likes or feed entries per transaction, PAUSE seconds apart
+ARCHIVE = {
+    'AFTER_DAYS': env.int("ARCHIVE_AFTER_DAYS", default=365),
+    'BATCH_SIZE': env.int("ARCHIVE_BATCH_SIZE", default=200),
+    'ROW_BATCH_SIZE': env.int("ARCHIVE_ROW_BATCH_SIZE", default=1000),
+    'PAUSE': env.float("ARCHIVE_PAUSE", default=0.1),
+}
+
+# IP geolocation for signup enrichment. DATABASE is a CSV range file
+# (network,country_code,latitude,longitude[,country_name]); the remote API is
+# only consulted for IPs missing from it when REMOTE_FALLBACK is on.
+GEOLOCATION = {
+    'DATABASE': env.str("GEOIP_DATABASE", default=None),
+    'CACHE_SIZE': env.int("GEOIP_CACHE_SIZE", default=10000),
+    'CACHE_TTL': env.int("GEOIP_CACHE_TTL", default=3600),
+    'REMOTE_FALLBACK': env.bool("GEOIP_REMOTE_FALLBACK", default=False),
+    'REMOTE_URL': env.str("GEOIP_REMOTE_URL", default="https://geolocation-db.com/json/{ip}?position=true"),
+    'REMOTE_TIMEOUT': env.float("GEOIP_REMOTE_TIMEOUT", default=3.0),
+}
+
+# MX/SMTP email verification, run by the job worker after signup
+EMAIL_VERIFICATION = {
+    'DNS_TIMEOUT': env.float("EMAIL_VERIFICATION_DNS_TIMEOUT", default=10),
+    'SMTP_TIMEOUT': env.float("EMAIL_VERIFICATION_SMTP_TIMEOUT", default=10),
+    'HELO_HOST': env.str("EMAIL_VERIFICATION_HELO_HOST", default="my.host.name"),
+    'FROM_ADDRESS': env.str("EMAIL_VERIFICATION_FROM_ADDRESS", default="my@from.addr.ess"),
+    'MX_CACHE_SIZE': env.int("EMAIL_VERIFICATION_MX_CACHE_SIZE", default=10000),
+    'MX_CACHE_TTL': env.int("EMAIL_VERIFICATION_MX_CACHE_TTL", default=3600),
+}
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(hours=24),